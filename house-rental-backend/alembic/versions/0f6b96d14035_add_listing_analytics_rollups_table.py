@@ -0,0 +1,36 @@
+"""add listing analytics rollups table
+
+Revision ID: 0f6b96d14035
+Revises: f26a6ea19dcd
+Create Date: 2026-10-17 19:41:52.306417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f6b96d14035'
+down_revision: Union[str, None] = 'f26a6ea19dcd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled lazily by the analytics endpoint; nothing to backfill
+    op.create_table('listing_analytics_rollups',
+    sa.Column('granularity', sa.String(), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('property_type', sa.String(), nullable=False),
+    sa.Column('listings', sa.Integer(), nullable=False),
+    sa.Column('rented', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('granularity', 'period_start', 'property_type')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('listing_analytics_rollups')
@@ -0,0 +1,51 @@
+"""add house amenities table
+
+Revision ID: 31337a6d33e4
+Revises: 4851b809bdc1
+Create Date: 2026-10-17 11:26:40.583190
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.house_amenity import normalize_amenities
+
+
+# revision identifiers, used by Alembic.
+revision: str = '31337a6d33e4'
+down_revision: Union[str, None] = '4851b809bdc1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('house_amenities',
+    sa.Column('house_id', sa.Integer(), nullable=False),
+    sa.Column('amenity', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['house_id'], ['houses.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('house_id', 'amenity')
+    )
+    op.create_index('ix_house_amenities_amenity_house_id', 'house_amenities', ['amenity', 'house_id'], unique=False)
+
+    # Backfill from the JSON column
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, amenities FROM houses WHERE amenities IS NOT NULL")).fetchall()
+    values = []
+    for row in rows:
+        amenities = row.amenities
+        if isinstance(amenities, str):
+            try:
+                amenities = json.loads(amenities)
+            except ValueError:
+                pass
+        values.extend({"house_id": row.id, "amenity": amenity} for amenity in normalize_amenities(amenities))
+    if values:
+        bind.execute(sa.text("INSERT INTO house_amenities (house_id, amenity) VALUES (:house_id, :amenity)"), values)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_house_amenities_amenity_house_id', table_name='house_amenities')
+    op.drop_table('house_amenities')
@@ -0,0 +1,44 @@
+"""add activity events table
+
+Revision ID: 45826b41a784
+Revises: 0f6b96d14035
+Create Date: 2026-10-17 20:02:37.551894
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '45826b41a784'
+down_revision: Union[str, None] = '0f6b96d14035'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('activity_events',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('agent_id', sa.Integer(), nullable=True),
+    sa.Column('actor_type', sa.String(), nullable=True),
+    sa.Column('actor_id', sa.Integer(), nullable=True),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('target_type', sa.String(), nullable=True),
+    sa.Column('target_id', sa.Integer(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_activity_events_agent_id_created_at_id',
+        'activity_events',
+        ['agent_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_activity_events_agent_id_created_at_id', table_name='activity_events')
+    op.drop_table('activity_events')
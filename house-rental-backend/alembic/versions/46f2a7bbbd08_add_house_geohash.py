@@ -0,0 +1,42 @@
+"""add house geohash
+
+Revision ID: 46f2a7bbbd08
+Revises: 68e8e46e1b01
+Create Date: 2026-10-17 09:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.geo import encode_geohash
+
+
+# revision identifiers, used by Alembic.
+revision: str = '46f2a7bbbd08'
+down_revision: Union[str, None] = '68e8e46e1b01'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('houses', sa.Column('geohash', sa.String(), nullable=True))
+    op.create_index(op.f('ix_houses_geohash'), 'houses', ['geohash'], unique=False)
+
+    # Backfill existing listings that already have coordinates
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, latitude, longitude FROM houses "
+        "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+    )).fetchall()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE houses SET geohash = :geohash WHERE id = :id"),
+            [{"id": row.id, "geohash": encode_geohash(row.latitude, row.longitude)} for row in rows],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_houses_geohash'), table_name='houses')
+    op.drop_column('houses', 'geohash')
@@ -0,0 +1,28 @@
+"""add house keyset indexes
+
+Revision ID: 4851b809bdc1
+Revises: 46f2a7bbbd08
+Create Date: 2026-10-17 10:03:51.402877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4851b809bdc1'
+down_revision: Union[str, None] = '46f2a7bbbd08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_houses_agent_id_id', 'houses', ['agent_id', 'id'], unique=False)
+    op.create_index('ix_houses_rent_price_id', 'houses', ['rent_price', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_houses_rent_price_id', table_name='houses')
+    op.drop_index('ix_houses_agent_id_id', table_name='houses')
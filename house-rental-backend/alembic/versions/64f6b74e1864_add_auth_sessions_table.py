@@ -0,0 +1,42 @@
+"""add auth sessions table
+
+Revision ID: 64f6b74e1864
+Revises: 45826b41a784
+Create Date: 2026-10-17 20:48:13.402175
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '64f6b74e1864'
+down_revision: Union[str, None] = '45826b41a784'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('auth_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('user_type', sa.String(), nullable=False),
+    sa.Column('principal_id', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('revoked', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_auth_sessions_id'), 'auth_sessions', ['id'], unique=False)
+    op.create_index(op.f('ix_auth_sessions_token_hash'), 'auth_sessions', ['token_hash'], unique=True)
+    op.create_index('ix_auth_sessions_principal', 'auth_sessions', ['user_type', 'principal_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_auth_sessions_principal', table_name='auth_sessions')
+    op.drop_index(op.f('ix_auth_sessions_token_hash'), table_name='auth_sessions')
+    op.drop_index(op.f('ix_auth_sessions_id'), table_name='auth_sessions')
+    op.drop_table('auth_sessions')
@@ -0,0 +1,34 @@
+"""add house rented_at
+
+Revision ID: 9b3e5c2a7d14
+Revises: 64f6b74e1864
+Create Date: 2026-10-17 21:36:40.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e5c2a7d14'
+down_revision: Union[str, None] = '64f6b74e1864'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('houses', sa.Column('rented_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Best available guess for houses rented before the column existed
+    op.execute(
+        "UPDATE houses SET rented_at = COALESCE(updated_at, created_at) "
+        "WHERE is_available = false"
+    )
+    # Stored periods attributed revenue by last edit; recompute them from rented_at on next use
+    op.execute("DELETE FROM listing_analytics_rollups")
+
+
+def downgrade() -> None:
+    op.drop_column('houses', 'rented_at')
@@ -0,0 +1,28 @@
+"""add house city and state lower indexes
+
+Revision ID: c7d1a84e2f53
+Revises: 9b3e5c2a7d14
+Create Date: 2026-10-17 22:14:08.730215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d1a84e2f53'
+down_revision: Union[str, None] = '9b3e5c2a7d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_houses_city_lower', 'houses', [sa.text('lower(city)')], unique=False)
+    op.create_index('ix_houses_state_lower', 'houses', [sa.text('lower(state)')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_houses_state_lower', table_name='houses')
+    op.drop_index('ix_houses_city_lower', table_name='houses')
@@ -0,0 +1,46 @@
+"""add agent listing stats table
+
+Revision ID: f26a6ea19dcd
+Revises: 31337a6d33e4
+Create Date: 2026-10-17 19:24:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f26a6ea19dcd'
+down_revision: Union[str, None] = '31337a6d33e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('agent_listing_stats',
+    sa.Column('agent_id', sa.Integer(), nullable=False),
+    sa.Column('total_properties', sa.Integer(), nullable=False),
+    sa.Column('available_properties', sa.Integer(), nullable=False),
+    sa.Column('rented_properties', sa.Integer(), nullable=False),
+    sa.Column('rented_revenue', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('agent_id')
+    )
+
+    # Backfill from the current listings
+    op.execute(
+        "INSERT INTO agent_listing_stats "
+        "(agent_id, total_properties, available_properties, rented_properties, rented_revenue) "
+        "SELECT agent_id, COUNT(id), "
+        "COUNT(CASE WHEN is_available = true THEN 1 END), "
+        "COUNT(CASE WHEN is_available = false THEN 1 END), "
+        "COALESCE(SUM(CASE WHEN is_available = false THEN rent_price ELSE 0 END), 0) "
+        "FROM houses WHERE agent_id IS NOT NULL GROUP BY agent_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('agent_listing_stats')
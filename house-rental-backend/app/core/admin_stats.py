@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.agent import Agent
+from app.models.agent_listing_stats import AgentListingStats
+from app.models.furniture_request import FurnitureRequest
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def compute_admin_stats(db: Session, recent_days: int) -> dict:
+    """Platform totals for the admin dashboard, one aggregate query per table.
+
+    Listing counts and revenue are summed from the per-agent rollup, so
+    their cost follows the number of agents rather than houses.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=recent_days)
+
+    total_users, recent_users = db.execute(
+        select(func.count(User.id), func.count(case((User.created_at >= cutoff, 1))))
+    ).one()
+    total_agents, recent_agents, average_rating = db.execute(
+        select(
+            func.count(Agent.id),
+            func.count(case((Agent.created_at >= cutoff, 1))),
+            func.avg(Agent.rating),
+        )
+    ).one()
+    total_properties, available_properties, rented_properties, total_revenue = db.execute(
+        select(
+            func.coalesce(func.sum(AgentListingStats.total_properties), 0),
+            func.coalesce(func.sum(AgentListingStats.available_properties), 0),
+            func.coalesce(func.sum(AgentListingStats.rented_properties), 0),
+            func.coalesce(func.sum(AgentListingStats.rented_revenue), 0.0),
+        )
+    ).one()
+    total_inquiries = db.scalar(select(func.count(FurnitureRequest.id)))
+
+    return {
+        "total_users": total_users,
+        "recent_users": recent_users,
+        "total_agents": total_agents,
+        "recent_agents": recent_agents,
+        "total_properties": total_properties,
+        "available_properties": available_properties,
+        "rented_properties": rented_properties,
+        "total_revenue": total_revenue,
+        "average_rating": average_rating if average_rating is not None else 0,
+        "total_inquiries": total_inquiries,
+        "recent_days": recent_days,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class AdminStatsSnapshot:
+    """Caches the admin stats and recomputes them once older than `max_age` seconds.
+
+    Concurrent readers of a stale snapshot wait for a single recomputation
+    instead of each running the aggregates.
+    """
+
+    def __init__(self, max_age: float, recent_days: int):
+        self.max_age = max_age
+        self.recent_days = recent_days
+        self._stats: Optional[dict] = None
+        self._computed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._stats is not None and time.monotonic() - self._computed_at < self.max_age
+
+    def get(self, db: Session) -> dict:
+        if self._is_fresh():
+            return self._stats
+        with self._lock:
+            if not self._is_fresh():
+                self._store(compute_admin_stats(db, self.recent_days))
+            return self._stats
+
+    def refresh(self, db: Session) -> dict:
+        with self._lock:
+            self._store(compute_admin_stats(db, self.recent_days))
+            return self._stats
+
+    def _store(self, stats: dict):
+        self._stats = stats
+        self._computed_at = time.monotonic()
+
+
+admin_stats = AdminStatsSnapshot(
+    max_age=settings.ADMIN_STATS_MAX_AGE_SECONDS,
+    recent_days=settings.ADMIN_RECENT_DAYS,
+)
+
+
+def refresh_admin_stats():
+    db = SessionLocal()
+    try:
+        admin_stats.refresh(db)
+    finally:
+        db.close()
+
+
+async def refresh_admin_stats_periodically(interval_seconds: int):
+    while True:
+        try:
+            await run_in_threadpool(refresh_admin_stats)
+        except Exception:
+            logger.exception("Refreshing the admin stats snapshot failed")
+        await asyncio.sleep(interval_seconds)
@@ -5,11 +5,73 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./house_rental.db"
+    DATABASE_REPLICA_URLS: list = []  # read replicas for read-only routes, as a JSON list in the env
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # a client reads from the primary this long after a write
+    READ_YOUR_WRITES_MAX_CLIENTS: int = 100000  # recent writers remembered per process
+    # Pool settings apply to each engine (sync and async) in every worker process
+    DB_POOL_SIZE: int = 5  # connections kept open
+    DB_MAX_OVERFLOW: int = 10  # extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: float = 30  # wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # replace connections older than this, -1 to keep them
+    DB_POOL_PRE_PING: bool = False  # test each connection on checkout, at the cost of a round trip
+    # SQLite performance mode: WAL, the pragmas below and a single writer connection per engine
+    SQLITE_PERFORMANCE_MODE: bool = False
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # with WAL, a power cut may lose the last commits but never corrupts
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KIB: int = 64 * 1024  # page cache per connection
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # wait this long on another process's write lock
     
     # Security
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60  # how long a resolved token identity is trusted without a lookup
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    BCRYPT_ROUNDS: int = 12  # raising it rehashes passwords on their next login
+    PASSWORD_HASH_WORKERS: int = 4  # threads for bcrypt hashing and verification
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0  # queued longer than this -> 503
+    LOGIN_IP_BURST: int = 20  # login attempts a client IP can make at once
+    LOGIN_IP_PER_MINUTE: float = 10  # refill rate; 0 disables the limiter
+    LOGIN_ACCOUNT_BURST: int = 5  # attempts per account name, whatever the IP
+    LOGIN_ACCOUNT_PER_MINUTE: float = 3  # refill rate; 0 disables the limiter
+    LOGIN_LIMITER_MAX_KEYS: int = 100000  # least recently used buckets are evicted beyond this
+    
+    # Search
+    SEARCH_ENGINE_ENABLED: bool = False  # serve simple filters from in-memory NumPy columns
+    SEARCH_ENGINE_REFRESH_SECONDS: int = 300  # full rebuild interval, 0 to disable
+    SEARCH_CACHE_MAX_ENTRIES: int = 2048
+    SEARCH_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SEARCH_CACHE_TTL_SECONDS: int = 60  # bounds staleness from writes served by other workers
+    FACETS_CACHE_TTL_SECONDS: int = 30
+    FACETS_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Write-behind buffers
+    VIEW_COUNT_FLUSH_SECONDS: float = 5.0
+    VIEW_COUNT_FLUSH_THRESHOLD: int = 1000  # distinct houses pending before an early flush
+    ACTIVITY_FLUSH_SECONDS: float = 2.0
+    ACTIVITY_FLUSH_THRESHOLD: int = 500  # events pending before an early flush
+    ACTIVITY_MAX_PENDING: int = 100000  # events beyond this are dropped while the database is unreachable
+    
+    # Bulk import
+    IMPORT_BATCH_SIZE: int = 500  # rows per executemany insert and transaction
+    IMPORT_MAX_ERRORS: int = 1000  # row errors kept in the report
+    IMPORT_MAX_LINE_BYTES: int = 1024 * 1024
+    
+    # Admin exports
+    EXPORT_CHUNK_ROWS: int = 1000  # rows fetched per round trip and written per chunk
+    
+    # Admin dashboard
+    ADMIN_STATS_MAX_AGE_SECONDS: int = 60  # recompute on read once the snapshot is older
+    ADMIN_STATS_REFRESH_SECONDS: int = 0  # background refresh interval, 0 to refresh on demand only
+    ADMIN_RECENT_DAYS: int = 30  # rolling window for recent users and agents
+    ANALYTICS_MAX_PERIODS: int = 400  # cap on day/week/month buckets per analytics request
+    DASHBOARD_WIDGET_TIMEOUT_SECONDS: float = 5.0  # per widget on the overview endpoints
+    
+    # SQL instrumentation: per-request query count and time, N+1 detection
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_REPEAT_WARN_THRESHOLD: int = 10  # warn when one statement shape runs more often in a request
+    SQL_STRICT_MODE: bool = False  # raise instead of warning, for test runs
     
     # CORS
     BACKEND_CORS_ORIGINS: list = ["*"]
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterator
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from app.core.config import settings
+from app.database.database import SessionLocal
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _cell(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def iter_export(stmt: Select, export_format: str, chunk_rows: int) -> Iterator[str]:
+    """Yield the rows of `stmt` as NDJSON or CSV text, `chunk_rows` rows per chunk.
+
+    Field names come from the selected column labels. Runs on its own
+    session rather than the request's: the body is produced after the
+    endpoint returns, and rows are fetched with `yield_per` so only one
+    chunk is in memory at a time.
+    """
+    db = SessionLocal()
+    try:
+        rows = db.execute(stmt.execution_options(yield_per=chunk_rows))
+        columns = list(rows.keys())
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for partition in rows.partitions():
+                writer.writerows([_cell(value) for value in row] for row in partition)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for partition in rows.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in partition
+                )
+    finally:
+        db.close()
+
+
+def export_response(stmt: Select, export_format: str, filename: str) -> StreamingResponse:
+    """Stream the rows of `stmt` as an attachment named `filename`.<format>."""
+    body = iter_export(stmt, export_format, settings.EXPORT_CHUNK_ROWS)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
@@ -0,0 +1,126 @@
+import math
+from typing import List, Optional, Tuple
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9  # ~4.8m x 4.8m cells, plenty for street addresses
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LON = 111.320  # at the equator, scaled by cos(latitude)
+
+# Upper bound used to turn a geohash prefix into an index range scan:
+# every hash starting with `prefix` sorts between `prefix` and `prefix + "~"`.
+PREFIX_RANGE_END = "~"
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits = bits << 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits = bits << 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(geohash)
+
+
+def geohash_for(latitude: Optional[float], longitude: Optional[float]) -> Optional[str]:
+    if latitude is None or longitude is None:
+        return None
+    return encode_geohash(latitude, longitude)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """Return the (lat, lon) size in degrees of a geohash cell at `precision`."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def km_per_degree_lon(latitude: float) -> float:
+    return KM_PER_DEGREE_LON * math.cos(math.radians(latitude))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Return (min_lat, max_lat, min_lon, max_lon) enclosing a circle around a point."""
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    lon_scale = km_per_degree_lon(latitude)
+    d_lon = 180.0 if lon_scale <= 1e-9 else min(radius_km / lon_scale, 180.0)
+    return (
+        max(latitude - d_lat, -90.0),
+        min(latitude + d_lat, 90.0),
+        max(longitude - d_lon, -180.0),
+        min(longitude + d_lon, 180.0),
+    )
+
+
+def _cell_span(low: float, high: float, origin: float, size: float) -> Tuple[int, int]:
+    return int(math.floor((low - origin) / size)), int(math.floor((high - origin) / size))
+
+
+def covering_prefixes(
+    min_lat: float,
+    max_lat: float,
+    min_lon: float,
+    max_lon: float,
+    max_cells: int = 32,
+) -> List[str]:
+    """Return geohash prefixes whose cells together cover the bounding box.
+
+    The finest precision that needs at most `max_cells` cells is chosen, so the
+    caller gets a handful of tight index ranges instead of a full table scan.
+    Boxes crossing the antimeridian are not split; clamp them before calling.
+    """
+    precision = 1
+    for candidate in range(1, GEOHASH_PRECISION + 1):
+        lat_size, lon_size = cell_size(candidate)
+        lat_lo, lat_hi = _cell_span(min_lat, max_lat, -90.0, lat_size)
+        lon_lo, lon_hi = _cell_span(min_lon, max_lon, -180.0, lon_size)
+        if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) > max_cells:
+            break
+        precision = candidate
+
+    lat_size, lon_size = cell_size(precision)
+    lat_lo, lat_hi = _cell_span(min_lat, max_lat, -90.0, lat_size)
+    lon_lo, lon_hi = _cell_span(min_lon, max_lon, -180.0, lon_size)
+
+    prefixes = set()
+    for lat_index in range(lat_lo, lat_hi + 1):
+        cell_lat = min(-90.0 + (lat_index + 0.5) * lat_size, 90.0)
+        for lon_index in range(lon_lo, lon_hi + 1):
+            cell_lon = min(-180.0 + (lon_index + 0.5) * lon_size, 180.0)
+            prefixes.add(encode_geohash(cell_lat, cell_lon, precision))
+    return sorted(prefixes)
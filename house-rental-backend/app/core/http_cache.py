@@ -0,0 +1,88 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+from fastapi import Request, Response
+from sqlalchemy import Select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def make_etag(*parts: Any) -> str:
+    # Weak: the validators track edits (updated_at), not every byte of the body,
+    # e.g. a house's views_count moves without changing its ETag
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+# HTTP dates stop at the second, so a Last-Modified is only trustworthy once its
+# second has passed; until then a second write could share it
+LAST_MODIFIED_SETTLE = timedelta(seconds=1)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def last_modified_of(model) -> Optional[datetime]:
+    value = model.updated_at or model.created_at
+    return _as_utc(value) if value else None
+
+
+async def list_validators(db: AsyncSession, stmt: Select, model) -> tuple:
+    """Cheap (count, newest change) validators for the rows matched by `stmt`.
+
+    Every insert and update stamps a microsecond timestamp later than any
+    before it, so a write always moves the newest change; a delete on its
+    own always moves the count.
+    """
+    result = await db.execute(stmt.with_only_columns(
+        func.count(model.id), func.max(func.coalesce(model.updated_at, model.created_at))
+    ).order_by(None))
+    count, newest = result.one()
+    if isinstance(newest, str):
+        # SQLite returns aggregates over DateTime columns untyped
+        newest = datetime.fromisoformat(newest)
+    return count, _as_utc(newest) if newest else None
+
+
+def _is_settled(last_modified: datetime) -> bool:
+    return last_modified <= datetime.now(timezone.utc) - LAST_MODIFIED_SETTLE
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since; compare weakly as RFC 9110 asks
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None and _is_settled(last_modified):
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None and _is_settled(last_modified):
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def conditional_response(
+    request: Request, response: Response, etag: str, last_modified: Optional[datetime]
+) -> Optional[Response]:
+    """Return a 304 if the client's copy is current; otherwise tag `response` and return None."""
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,125 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import DateTime, and_, or_
+from sqlalchemy.orm import Query
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, key: Any, last_id: int) -> str:
+    payload = json.dumps({"s": sort, "k": key, "id": last_id}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    """Return the (sort key, id) of the last row the client saw."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key, last_id = payload["k"], int(payload["id"])
+        cursor_sort = payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if cursor_sort != sort:
+        raise InvalidCursor("Cursor does not match the requested sort order")
+    return key, last_id
+
+
+def encode_offset_cursor(sort: str, offset: int) -> str:
+    payload = json.dumps({"s": sort, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_offset_cursor(cursor: str, sort: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset, cursor_sort = int(payload["o"]), payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+    if cursor_sort != sort or offset < 0:
+        raise InvalidCursor("Cursor does not match the requested sort order")
+    return offset
+
+
+def offset_page(
+    query: Query,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    sort: str = "relevance",
+) -> Tuple[List[Any], Optional[str]]:
+    """Page through an order with no stable per-row key (e.g. relevance scores).
+
+    The cursor just carries the next offset, so clients can use one opaque
+    cursor API for every sort order.
+    """
+    if cursor:
+        offset = decode_offset_cursor(cursor, sort)
+
+    rows = query.offset(offset).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, encode_offset_cursor(sort, offset + limit) if has_more else None
+
+
+def keyset_page(
+    query: Query,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0,
+    sort: str = "id",
+    key_column=None,
+    descending: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page ordered by (key_column, id) starting after `cursor`.
+
+    Seeks straight to the last seen row instead of skipping `offset` rows, so
+    every page costs the same and concurrent inserts don't shift results.
+    `offset` is only honoured without a cursor, for backward compatibility.
+    Returns the rows and the cursor for the following page (None on the last).
+    """
+    if key_column is not None:
+        query = query.add_columns(key_column.label("sort_key"))
+
+    if cursor:
+        key, last_id = decode_cursor(cursor, sort)
+        if key_column is not None and key is not None and isinstance(key_column.type, DateTime):
+            # Cursors carry timestamps as ISO strings
+            try:
+                key = datetime.fromisoformat(key)
+            except (TypeError, ValueError):
+                raise InvalidCursor("Invalid cursor")
+        if key_column is None:
+            query = query.filter(id_column < last_id if descending else id_column > last_id)
+        elif descending:
+            query = query.filter(or_(key_column < key, and_(key_column == key, id_column < last_id)))
+        else:
+            query = query.filter(or_(key_column > key, and_(key_column == key, id_column > last_id)))
+
+    if key_column is None:
+        query = query.order_by(id_column.desc() if descending else id_column)
+    elif descending:
+        query = query.order_by(key_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(key_column, id_column)
+
+    if offset and not cursor:
+        query = query.offset(offset)
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if key_column is None:
+        items = rows
+        next_cursor = encode_cursor(sort, None, items[-1].id) if has_more and items else None
+    else:
+        items = [row[0] for row in rows]
+        next_cursor = encode_cursor(sort, rows[-1].sort_key, items[-1].id) if has_more and items else None
+    return items, next_cursor
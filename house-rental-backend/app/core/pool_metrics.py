@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Optional
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+# Upper bounds of the checkout latency buckets; slower checkouts land in the last, open bucket
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """Checkout counters and a latency histogram for one connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def record_checkout(self, elapsed: float, waited: bool):
+        elapsed_ms = elapsed * 1000
+        bucket = next((i for i, bound in enumerate(CHECKOUT_BUCKETS_MS) if elapsed_ms <= bound), -1)
+        with self._lock:
+            self.checkouts += 1
+            if waited:
+                self.waits += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self.buckets[bucket] += 1
+
+    def record_timeout(self):
+        # A timed-out checkout always waited
+        with self._lock:
+            self.waits += 1
+            self.timeouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def stats(self, pool: Pool) -> dict:
+        with self._lock:
+            histogram = [
+                {"le_ms": bound, "count": count}
+                for bound, count in zip((*CHECKOUT_BUCKETS_MS, None), self.buckets)
+            ]
+            return {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "checkout_ms_avg": round(self.total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "checkout_ms_max": round(self.max_ms, 3),
+                "checkout_ms_histogram": histogram,
+            }
+
+
+class _InstrumentedPoolMixin:
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        # Every connection is in use and overflow is spent: this checkout queues
+        limit = self.size() + self._max_overflow
+        waited = self._max_overflow > -1 and self.checkedout() >= limit
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started, waited)
+        return connection
+
+    def _create_connection(self):
+        self.metrics.record_connect()
+        return super()._create_connection()
+
+
+def instrumented_pool_class(pool_class: type, metrics: PoolMetrics) -> type:
+    """A subclass of a QueuePool class that reports into `metrics`.
+
+    The metrics live on the class, so they survive the pool being recreated
+    by engine.dispose().
+    """
+    return type(f"Instrumented{pool_class.__name__}", (_InstrumentedPoolMixin, pool_class), {"metrics": metrics})
+
+
+def pool_stats(pool: Pool) -> Optional[dict]:
+    metrics = getattr(pool, "metrics", None)
+    return metrics.stats(pool) if metrics is not None else None
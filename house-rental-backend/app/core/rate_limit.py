@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets: `burst` attempts at once, refilled at `rate_per_minute`.
+
+    Keeps at most `max_keys` buckets and evicts the least recently used, so a
+    flood of distinct keys (e.g. spoofed usernames) can't grow memory. An
+    evicted key simply starts again with a full bucket. A rate of 0 or less
+    disables the limiter.
+    """
+
+    def __init__(self, burst: int, rate_per_minute: float, max_keys: int = 100000):
+        self.burst = burst
+        self.enabled = rate_per_minute > 0
+        self.rate = rate_per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def acquire(self, key: Hashable) -> Tuple[bool, float]:
+        """Take one token for `key`; returns (allowed, seconds until the next token)."""
+        if not self.enabled:
+            return True, 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            else:
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        retry_after = 0.0 if allowed else (1 - tokens) / self.rate
+        return allowed, retry_after
+
+    def reset(self, key: Hashable):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
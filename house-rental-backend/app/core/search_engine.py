@@ -0,0 +1,260 @@
+import asyncio
+import logging
+import threading
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.house import House
+from app.schemas.house import HouseSearch
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL_FIELDS = ("property_type", "pet_policy", "parking")
+NO_CATEGORY = -1  # code for NULL categorical values
+
+# The columns the index keeps, detached from the ORM object they were read from
+IndexedRow = namedtuple("IndexedRow", ("id", "rent_price", "bedrooms", "bathrooms", *CATEGORICAL_FIELDS))
+
+
+class ColumnarHouseIndex:
+    """Available listings held as NumPy column arrays for vectorized filtering.
+
+    Only the filter columns live here; the database is still the source of
+    truth and is only asked to hydrate the final page of ids. Rows are kept
+    in id order so keyset pagination by id works on the arrays directly.
+
+    Each worker process holds its own copy, updated by the writes it serves
+    and fully rebuilt every SEARCH_ENGINE_REFRESH_SECONDS to pick up writes
+    made by other workers.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._codes: Dict[str, Dict[str, int]] = {field: {} for field in CATEGORICAL_FIELDS}
+        # One per running rebuild: house id -> latest row, or None if removed
+        self._rebuild_changes: List[Dict[int, Optional[IndexedRow]]] = []
+        self._allocate(0)
+
+    def _allocate(self, capacity: int):
+        self._size = 0
+        self._live_count = 0
+        self._ordered = True
+        self._positions: Dict[int, int] = {}
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.bedrooms = np.zeros(capacity, dtype=np.int32)
+        self.bathrooms = np.zeros(capacity, dtype=np.float64)
+        self.categories = {field: np.zeros(capacity, dtype=np.int32) for field in CATEGORICAL_FIELDS}
+        self.live = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, capacity: int):
+        def resized(array):
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            return grown
+
+        self.ids = resized(self.ids)
+        self.price = resized(self.price)
+        self.bedrooms = resized(self.bedrooms)
+        self.bathrooms = resized(self.bathrooms)
+        self.categories = {field: resized(array) for field, array in self.categories.items()}
+        self.live = resized(self.live)
+
+    def _code(self, field: str, value: Optional[str]) -> int:
+        if value is None:
+            return NO_CATEGORY
+        codes = self._codes[field]
+        if value not in codes:
+            codes[value] = len(codes)
+        return codes[value]
+
+    def _write_row(self, position: int, house: House):
+        self.ids[position] = house.id
+        self.price[position] = house.rent_price
+        self.bedrooms[position] = house.bedrooms
+        self.bathrooms[position] = house.bathrooms
+        for field in CATEGORICAL_FIELDS:
+            self.categories[field][position] = self._code(field, getattr(house, field))
+        self.live[position] = True
+
+    def rebuild(self, db: Session):
+        """Reload every available listing from the database.
+
+        Upserts and removes that land while the query runs are logged and
+        replayed over the fresh arrays, so the swap cannot undo them.
+        """
+        if not self.enabled:
+            return
+        changes: Dict[int, Optional[IndexedRow]] = {}
+        with self._lock:
+            self._rebuild_changes.append(changes)
+        try:
+            houses = (
+                db.query(
+                    House.id, House.rent_price, House.bedrooms, House.bathrooms,
+                    House.property_type, House.pet_policy, House.parking,
+                )
+                .filter(House.is_available == True)
+                .order_by(House.id)
+                .all()
+            )
+        except Exception:
+            with self._lock:
+                self._rebuild_changes.remove(changes)
+            raise
+        with self._lock:
+            self._rebuild_changes.remove(changes)
+            self._codes = {field: {} for field in CATEGORICAL_FIELDS}
+            self._allocate(len(houses))
+            for position, house in enumerate(houses):
+                self._write_row(position, house)
+                self._positions[house.id] = position
+            self._size = self._live_count = len(houses)
+            for house_id, row in changes.items():
+                if row is None:
+                    self._remove(house_id)
+                else:
+                    self._upsert(row)
+
+    def _log_change(self, house_id: int, row: Optional[IndexedRow]):
+        for changes in self._rebuild_changes:
+            changes[house_id] = row
+
+    def upsert(self, house: House):
+        if not self.enabled:
+            return
+        if not house.is_available:
+            self.remove(house.id)
+            return
+        row = IndexedRow(*(getattr(house, field) for field in IndexedRow._fields))
+        with self._lock:
+            self._log_change(row.id, row)
+            self._upsert(row)
+
+    def _upsert(self, row: IndexedRow):
+        position = self._positions.get(row.id)
+        if position is None:
+            if self._size == len(self.ids):
+                self._grow(max(16, 2 * len(self.ids)))
+            position = self._size
+            if self._size and row.id < self.ids[self._size - 1]:
+                self._ordered = False
+            self._size += 1
+            self._live_count += 1
+            self._positions[row.id] = position
+        self._write_row(position, row)
+
+    def remove(self, house_id: int):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._log_change(house_id, None)
+            self._remove(house_id)
+
+    def _remove(self, house_id: int):
+        position = self._positions.pop(house_id, None)
+        if position is None:
+            return
+        self.live[position] = False
+        self._live_count -= 1
+        if self._live_count < self._size // 2:
+            self._compact()
+
+    def _compact(self):
+        # Drop tombstoned rows and restore id order once more than half are dead
+        keep = np.flatnonzero(self.live[:self._size])
+        keep = keep[np.argsort(self.ids[keep], kind="stable")]
+        self.ids = self.ids[keep]
+        self.price = self.price[keep]
+        self.bedrooms = self.bedrooms[keep]
+        self.bathrooms = self.bathrooms[keep]
+        self.categories = {field: array[keep] for field, array in self.categories.items()}
+        self.live = self.live[keep]
+        self._size = self._live_count = len(keep)
+        self._positions = {int(house_id): position for position, house_id in enumerate(self.ids)}
+        self._ordered = True
+
+    def can_serve(self, search: HouseSearch) -> bool:
+        """Whether `search` only uses filters the columns can answer."""
+        return (
+            self.enabled
+            and search.available_only
+            and search.sort_by in (None, "id")
+            and not search.q
+            and not search.city
+            and not search.state
+            and not search.amenities
+            and search.lat is None
+            and search.lon is None
+            and search.radius_km is None
+            and search.min_lat is None
+            and search.max_lat is None
+            and search.min_lon is None
+            and search.max_lon is None
+        )
+
+    def search(
+        self,
+        search: HouseSearch,
+        limit: int,
+        after_id: Optional[int] = None,
+        offset: int = 0,
+    ) -> Tuple[List[int], bool]:
+        """Return up to `limit` matching ids in id order, and whether more follow."""
+        with self._lock:
+            size = self._size
+            mask = self.live[:size].copy()
+
+            if search.min_price is not None:
+                mask &= self.price[:size] >= search.min_price
+            if search.max_price is not None:
+                mask &= self.price[:size] <= search.max_price
+            if search.min_bedrooms is not None:
+                mask &= self.bedrooms[:size] >= search.min_bedrooms
+            if search.max_bedrooms is not None:
+                mask &= self.bedrooms[:size] <= search.max_bedrooms
+            if search.min_bathrooms is not None:
+                mask &= self.bathrooms[:size] >= search.min_bathrooms
+            if search.max_bathrooms is not None:
+                mask &= self.bathrooms[:size] <= search.max_bathrooms
+            for field in CATEGORICAL_FIELDS:
+                value = getattr(search, field)
+                if value:
+                    code = self._codes[field].get(value)
+                    if code is None:
+                        return [], False
+                    mask &= self.categories[field][:size] == code
+            if after_id is not None:
+                mask &= self.ids[:size] > after_id
+
+            matched = self.ids[:size][mask]
+            if not self._ordered:
+                matched = np.sort(matched)
+
+        page = matched[offset:offset + limit + 1]
+        return [int(house_id) for house_id in page[:limit]], len(page) > limit
+
+
+house_index = ColumnarHouseIndex(enabled=settings.SEARCH_ENGINE_ENABLED)
+
+
+def rebuild_house_index():
+    db = SessionLocal()
+    try:
+        house_index.rebuild(db)
+    finally:
+        db.close()
+
+
+async def refresh_house_index_periodically(interval_seconds: int):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(rebuild_house_index)
+        except Exception:
+            logger.exception("Rebuilding the in-memory house index failed")
@@ -1,19 +1,36 @@
+import asyncio
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import LRUCache
 from app.core.config import settings
-from app.database.database import get_db
+from app.database.database import get_async_db
 from app.models.user import User
 from app.models.agent import Agent
-from app.schemas.token import TokenData
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.schemas.token import Principal, TokenData
+
+# min_rounds marks hashes made with a lower cost as needing an update, so raising
+# BCRYPT_ROUNDS upgrades existing hashes as users log in
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
 security = HTTPBearer()
 
+# Resolved principals keyed on (user_type, username); the TTL bounds how long a
+# change made outside update_user_me/update_agent_me (or on another worker) can go unseen
+principal_cache = LRUCache(maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -23,6 +40,58 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# bcrypt is deliberately slow; request handlers hash on this pool instead of the event loop
+password_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+
+class PasswordHashingBusy(Exception):
+    pass
+
+
+async def _run_password_job(fn, *args):
+    """Run `fn` on the hashing pool; 503 if it waited in the queue too long."""
+    submitted_at = time.monotonic()
+
+    def job():
+        # Jobs that waited past the timeout are dropped instead of hashed, so a
+        # backlog drains quickly rather than compounding
+        if time.monotonic() - submitted_at > settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS:
+            raise PasswordHashingBusy
+        return fn(*args)
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_hash_executor, job)
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+async def hash_password(password: str) -> str:
+    return await _run_password_job(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify off the event loop; also returns a new hash if the stored one is outdated."""
+    return await _run_password_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+_dummy_password_hash: Optional[str] = None
+
+
+async def verify_dummy_password(plain_password: str) -> bool:
+    """Spend a real verify's bcrypt time on an unknown account, so timing doesn't reveal it exists."""
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        _dummy_password_hash = await hash_password(secrets.token_urlsafe(16))
+    await verify_and_update_password(plain_password, _dummy_password_hash)
+    return False
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -52,9 +121,9 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     return token_data
 
 
-def get_current_user(token_data: TokenData = Depends(verify_token), db: Session = Depends(get_db)):
+async def get_current_user(token_data: TokenData = Depends(verify_token), db: AsyncSession = Depends(get_async_db)):
     if token_data.user_type == "user":
-        user = db.query(User).filter(User.username == token_data.username).first()
+        user = await db.scalar(select(User).where(User.username == token_data.username).limit(1))
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -62,7 +131,7 @@ def get_current_user(token_data: TokenData = Depends(verify_token), db: Session
             )
         return user
     elif token_data.user_type == "agent":
-        agent = db.query(Agent).filter(Agent.username == token_data.username).first()
+        agent = await db.scalar(select(Agent).where(Agent.username == token_data.username).limit(1))
         if agent is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -84,7 +153,7 @@ def get_current_active_user(current_user: Union[User, Agent] = Depends(get_curre
 
 
 
-def get_current_agent(token_data: TokenData = Depends(verify_token), db: Session = Depends(get_db)):
+async def get_current_agent(token_data: TokenData = Depends(verify_token), db: AsyncSession = Depends(get_async_db)):
     """Get current agent from token, ensuring the user is an agent"""
     if token_data.user_type != "agent":
         raise HTTPException(
@@ -92,7 +161,7 @@ def get_current_agent(token_data: TokenData = Depends(verify_token), db: Session
             detail="Access denied. Agent privileges required.",
         )
     
-    agent = db.query(Agent).filter(Agent.username == token_data.username).first()
+    agent = await db.scalar(select(Agent).where(Agent.username == token_data.username).limit(1))
     if agent is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -111,30 +180,76 @@ def get_current_active_agent(current_agent: Agent = Depends(get_current_agent)):
 
 
 
-def get_current_admin(token_data: TokenData = Depends(verify_token), db: Session = Depends(get_db)):
-    """Get current admin user from token, ensuring the user has admin privileges"""
-    if token_data.user_type != "user":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied. Admin privileges required.",
-        )
-    
-    user = db.query(User).filter(User.username == token_data.username).first()
-    if user is None:
+def invalidate_principal(user_type: str, username: str):
+    principal_cache.delete((user_type, username))
+
+
+async def _load_principal(db: AsyncSession, user_type: str, username: str) -> Optional[Principal]:
+    if user_type == "user":
+        stmt = select(User.id, User.is_active, User.is_admin).where(User.username == username)
+    elif user_type == "agent":
+        stmt = select(Agent.id, Agent.is_active).where(Agent.username == username)
+    else:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+            detail="Invalid user type",
         )
-    
-    if not user.is_active:
+    row = (await db.execute(stmt.limit(1))).first()
+    if row is None:
+        return None
+    return Principal(
+        id=row.id,
+        user_type=user_type,
+        username=username,
+        is_active=bool(row.is_active),
+        is_admin=bool(getattr(row, "is_admin", False)),
+    )
+
+
+async def get_current_principal(
+    token_data: TokenData = Depends(verify_token), db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Identity of an active caller; served from principal_cache, so usually no query.
+
+    For routes that only need who is calling. Routes that read or change the
+    caller's own row should keep using get_current_active_user.
+    """
+    key = (token_data.user_type, token_data.username)
+    principal = principal_cache.get(key)
+    if principal is None:
+        generation = principal_cache.generation
+        principal = await _load_principal(db, token_data.user_type, token_data.username)
+        if principal is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+        principal_cache.set(key, principal, generation=generation)
+
+    if not principal.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    
-  #  For now, we'll assume all users can be admins. In a real app, you'd check for admin role
-    if not user.is_admin:
+    return principal
+
+
+def get_agent_principal(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """Cached counterpart of get_current_agent for routes that only need the agent's id"""
+    if principal.user_type != "agent":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied. Admin privileges required.",
+            detail="Access denied. Agent privileges required.",
         )
-    
-    return user
+    return principal
 
+
+def get_current_admin(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """Get current admin user from token, ensuring the user has admin privileges.
+
+    Returns the cached Principal rather than the User row; admin routes only
+    need to know who is calling.
+    """
+    if principal.user_type != "user" or not principal.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied. Admin privileges required.",
+        )
+    return principal
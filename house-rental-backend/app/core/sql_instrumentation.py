@@ -0,0 +1,97 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Expanded IN lists vary in length per call but are the same statement shape
+_PARAM_LIST_RE = re.compile(r"\(\s*(?:\?|%\(\w+\)s|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+))*\s*\)")
+
+
+class RepeatedQueryError(RuntimeError):
+    """Raised in strict mode when one statement shape repeats too often in a request."""
+
+
+def fingerprint(statement: str) -> str:
+    statement = _WHITESPACE_RE.sub(" ", statement).strip()
+    return _PARAM_LIST_RE.sub("(?)", statement)
+
+
+class RequestQueryStats:
+    """Queries run on behalf of one request, possibly from several threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints: Counter = Counter()
+
+    def record_start(self, statement: str) -> int:
+        """Count a statement about to run; returns how often its shape has run in this request."""
+        shape = fingerprint(statement)
+        with self._lock:
+            self.count += 1
+            self.fingerprints[shape] += 1
+            return self.fingerprints[shape]
+
+    def record_duration(self, seconds: float):
+        with self._lock:
+            self.seconds += seconds
+
+    def repeated(self, threshold: int) -> list:
+        with self._lock:
+            return [(shape, count) for shape, count in self.fingerprints.most_common() if count > threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is None:
+        return
+    repeats = stats.record_start(statement)
+    if settings.SQL_STRICT_MODE and repeats > settings.SQL_REPEAT_WARN_THRESHOLD:
+        raise RepeatedQueryError(
+            f"Statement ran {repeats} times in one request, likely an N+1: {fingerprint(statement)[:300]}"
+        )
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    started = conn.info.get("query_started_at")
+    if stats is None or not started:
+        return
+    stats.record_duration(time.perf_counter() - started.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+def report_repeated_queries(stats: RequestQueryStats, method: str, path: str):
+    for shape, count in stats.repeated(settings.SQL_REPEAT_WARN_THRESHOLD):
+        logger.warning("Possible N+1: %s %s ran this statement %d times: %s", method, path, count, shape[:300])
+
+
+def report_streamed_queries(stats: RequestQueryStats, method: str, path: str):
+    logger.info("%s %s streamed its body: %d queries, %.1f ms", method, path, stats.count, stats.seconds * 1000)
+    report_repeated_queries(stats, method, path)
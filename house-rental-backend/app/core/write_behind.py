@@ -0,0 +1,203 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, func, insert, update
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.database.database import writer_engine
+from app.models.activity_event import ActivityEvent
+from app.models.house import House
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer(ABC):
+    """Collects writes in memory and applies them in batches off the request path.
+
+    A daemon thread flushes every `flush_interval` seconds, or sooner once
+    `flush_threshold` items are pending. Subclasses implement `_take()` to
+    swap out the pending batch, `_write()` to persist it and `_restore()` to
+    put it back if the write fails, so nothing is lost on transient errors.
+    """
+
+    name = "write-behind"
+
+    def __init__(self, engine: Engine, flush_interval: float, flush_threshold: int):
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @abstractmethod
+    def _take(self):
+        ...
+
+    @abstractmethod
+    def _write(self, batch):
+        ...
+
+    @abstractmethod
+    def _restore(self, batch):
+        ...
+
+    @abstractmethod
+    def _pending_size(self) -> int:
+        ...
+
+    def _added(self):
+        # Called by subclasses after buffering; wake the flusher early when full
+        if self._pending_size() >= self.flush_threshold:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        if not batch:
+            return
+        try:
+            self._write(batch)
+        except Exception:
+            logger.exception("Flushing %s buffer failed; will retry", self.name)
+            with self._lock:
+                self._restore(batch)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher thread and write out whatever is still pending."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+
+
+class ViewCountBuffer(WriteBehindBuffer):
+    """Aggregates house view increments and applies them in one batched UPDATE."""
+
+    name = "view-count"
+
+    def __init__(self, engine: Engine, flush_interval: float, flush_threshold: int):
+        super().__init__(engine, flush_interval, flush_threshold)
+        self._counts: Dict[int, int] = defaultdict(int)
+
+    def increment(self, house_id: int, amount: int = 1):
+        with self._lock:
+            self._counts[house_id] += amount
+        self._added()
+
+    def pending(self, house_id: int) -> int:
+        with self._lock:
+            return self._counts.get(house_id, 0)
+
+    def _pending_size(self) -> int:
+        return len(self._counts)
+
+    def _take(self):
+        counts, self._counts = self._counts, defaultdict(int)
+        return counts
+
+    def _restore(self, batch):
+        for house_id, amount in batch.items():
+            self._counts[house_id] += amount
+
+    def _write(self, batch):
+        stmt = (
+            update(House)
+            .where(House.id == bindparam("house_id"))
+            .values(
+                views_count=func.coalesce(House.views_count, 0) + bindparam("increment"),
+                # A view is not an edit; keep updated_at unchanged
+                updated_at=House.updated_at,
+            )
+        )
+        # Sorted ids give concurrent flushers from other workers a consistent lock order
+        rows = [{"house_id": house_id, "increment": amount} for house_id, amount in sorted(batch.items())]
+        with self.engine.begin() as conn:
+            conn.execute(stmt, rows)
+
+
+class ActivityEventBuffer(WriteBehindBuffer):
+    """Queues activity events and inserts them with one executemany per flush."""
+
+    name = "activity"
+
+    def __init__(self, engine: Engine, flush_interval: float, flush_threshold: int, max_pending: int):
+        super().__init__(engine, flush_interval, flush_threshold)
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._events: List[dict] = []
+
+    def record(
+        self,
+        event_type: str,
+        agent_id: Optional[int] = None,
+        actor_type: Optional[str] = None,
+        actor_id: Optional[int] = None,
+        target_type: Optional[str] = None,
+        target_id: Optional[int] = None,
+        payload: Optional[dict] = None,
+    ):
+        event = {
+            "event_type": event_type,
+            "agent_id": agent_id,
+            "actor_type": actor_type,
+            "actor_id": actor_id,
+            "target_type": target_type,
+            "target_id": target_id,
+            "payload": payload,
+            "created_at": datetime.now(timezone.utc),
+        }
+        with self._lock:
+            # The log is best-effort; don't let a long database outage eat memory
+            if len(self._events) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._events.append(event)
+        self._added()
+
+    def _pending_size(self) -> int:
+        return len(self._events)
+
+    def _take(self):
+        events, self._events = self._events, []
+        return events
+
+    def _restore(self, batch):
+        self._events[:0] = batch[:max(self.max_pending - len(self._events), 0)]
+
+    def _write(self, batch):
+        with self.engine.begin() as conn:
+            conn.execute(insert(ActivityEvent), batch)
+
+
+view_counts = ViewCountBuffer(
+    writer_engine,
+    flush_interval=settings.VIEW_COUNT_FLUSH_SECONDS,
+    flush_threshold=settings.VIEW_COUNT_FLUSH_THRESHOLD,
+)
+
+activity_log = ActivityEventBuffer(
+    writer_engine,
+    flush_interval=settings.ACTIVITY_FLUSH_SECONDS,
+    flush_threshold=settings.ACTIVITY_FLUSH_THRESHOLD,
+    max_pending=settings.ACTIVITY_MAX_PENDING,
+)
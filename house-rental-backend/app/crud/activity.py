@@ -0,0 +1,61 @@
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.pagination import keyset_page
+from app.models.activity_event import ActivityEvent
+from app.models.agent import Agent
+from app.schemas.token import Principal
+
+EVENT_TITLES = {
+    "house_created": "New listing",
+    "house_updated": "Updated listing",
+    "house_deleted": "Removed listing",
+    "houses_imported": "Imported listings",
+    "review_created": "New review",
+    "review_updated": "Review edited",
+    "review_deleted": "Review removed",
+    "furniture_request_created": "New moving request",
+    "furniture_request_updated": "Moving request updated",
+    "furniture_request_deleted": "Moving request cancelled",
+}
+
+
+def actor_of(principal) -> dict:
+    """actor_type/actor_id keyword arguments for activity_log.record()."""
+    if principal is None:
+        return {"actor_type": None, "actor_id": None}
+    if isinstance(principal, Principal):
+        return {"actor_type": principal.user_type, "actor_id": principal.id}
+    return {"actor_type": "agent" if isinstance(principal, Agent) else "user", "actor_id": principal.id}
+
+
+def recent_activity(
+    db: Session, agent_id: int, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[ActivityEvent], Optional[str]]:
+    # Seeks on (agent_id, created_at desc, id desc); cost follows the page size, not the log
+    query = db.query(ActivityEvent).filter(ActivityEvent.agent_id == agent_id)
+    return keyset_page(
+        query,
+        ActivityEvent.id,
+        limit,
+        cursor=cursor,
+        sort="activity",
+        key_column=ActivityEvent.created_at,
+        descending=True,
+    )
+
+
+def activity_item(event: ActivityEvent) -> dict:
+    payload = event.payload or {}
+    title = EVENT_TITLES.get(event.event_type, event.event_type.replace("_", " ").capitalize())
+    return {
+        "id": event.id,
+        "type": event.event_type,
+        "title": f"{title}: {payload['title']}" if payload.get("title") else title,
+        "description": payload.get("description"),
+        "timestamp": event.created_at.isoformat() if event.created_at else None,
+        "actor_type": event.actor_type,
+        "actor_id": event.actor_id,
+        "target_type": event.target_type,
+        "target_id": event.target_id,
+        "payload": payload,
+    }
@@ -0,0 +1,93 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.agent_listing_stats import AgentListingStats
+from app.models.house import House
+
+# What a house contributes to its agent's rollup: (agent_id, is_available, rent_price)
+ListingSnapshot = Tuple[int, Optional[bool], float]
+
+DELTA_COLUMNS = ("total_properties", "available_properties", "rented_properties", "rented_revenue")
+
+_UPSERT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def listing_snapshot(house: House) -> Optional[ListingSnapshot]:
+    if house is None or house.agent_id is None:
+        return None
+    return house.agent_id, house.is_available, house.rent_price or 0.0
+
+
+def _contribution(snapshot: ListingSnapshot) -> tuple:
+    # Mirrors the old queries: None availability is neither available nor rented
+    _, is_available, rent_price = snapshot
+    rented = is_available is False
+    return (1, 1 if is_available is True else 0, 1 if rented else 0, rent_price if rented else 0.0)
+
+
+def record_listing_changes(
+    db: Session, changes: Iterable[Tuple[Optional[ListingSnapshot], Optional[ListingSnapshot]]]
+):
+    """Apply (before, after) house snapshots to the rollup in the caller's transaction.
+
+    `before` is None for a new house and `after` is None for a deleted one;
+    a change of agent moves the house between two rows.
+    """
+    deltas: Dict[int, list] = defaultdict(lambda: [0, 0, 0, 0.0])
+    for before, after in changes:
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None:
+                continue
+            delta = deltas[snapshot[0]]
+            for i, value in enumerate(_contribution(snapshot)):
+                delta[i] += sign * value
+
+    # Sorted agent ids keep the row lock order consistent across writers
+    for agent_id, delta in sorted(deltas.items()):
+        if any(delta):
+            _apply_delta(db, agent_id, dict(zip(DELTA_COLUMNS, delta)))
+
+
+def record_house_change(db: Session, before: Optional[ListingSnapshot], after: Optional[ListingSnapshot]):
+    record_listing_changes(db, [(before, after)])
+
+
+def _apply_delta(db: Session, agent_id: int, delta: dict):
+    table = AgentListingStats.__table__
+    increments = {name: getattr(table.c, name) + value for name, value in delta.items()}
+    upsert_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if upsert_insert is not None:
+        stmt = upsert_insert(table).values(agent_id=agent_id, **delta)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.agent_id],
+            set_={**increments, "updated_at": func.now()},
+        ))
+        return
+
+    result = db.execute(update(table).where(table.c.agent_id == agent_id).values(**increments))
+    if result.rowcount == 0:
+        db.execute(insert(table).values(agent_id=agent_id, **delta))
+
+
+def rebuild_agent_listing_stats(db: Session) -> int:
+    """Recompute every agent's row from the houses table; returns the row count."""
+    rented = House.is_available == False
+    totals = (
+        select(
+            House.agent_id,
+            func.count(House.id),
+            func.count(case((House.is_available == True, 1))),
+            func.count(case((rented, 1))),
+            func.coalesce(func.sum(case((rented, House.rent_price), else_=0.0)), 0.0),
+        )
+        .where(House.agent_id.isnot(None))
+        .group_by(House.agent_id)
+    )
+    db.execute(delete(AgentListingStats))
+    result = db.execute(
+        insert(AgentListingStats).from_select(["agent_id", *DELTA_COLUMNS], totals)
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,60 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.auth_session import AuthSession
+
+
+def hash_refresh_token(token: str) -> str:
+    # Tokens are 256 random bits, so a fast hash is enough to make a leaked table useless
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def create_session(db: Session, user_type: str, principal_id: int) -> str:
+    """Start a session and return its refresh token; the caller commits."""
+    token = secrets.token_urlsafe(32)
+    db.add(AuthSession(
+        token_hash=hash_refresh_token(token),
+        user_type=user_type,
+        principal_id=principal_id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def get_session(db: Session, token: str) -> Optional[AuthSession]:
+    return db.query(AuthSession).filter(AuthSession.token_hash == hash_refresh_token(token)).first()
+
+
+def is_expired(session: AuthSession) -> bool:
+    return _as_utc(session.expires_at) <= datetime.now(timezone.utc)
+
+
+def revoke_session(db: Session, session_id: int) -> bool:
+    """Mark a session revoked; False if it already was (e.g. a concurrent refresh won)."""
+    result = db.execute(
+        update(AuthSession)
+        .where(AuthSession.id == session_id, AuthSession.revoked == False)
+        .values(revoked=True, revoked_at=datetime.now(timezone.utc))
+    )
+    return result.rowcount == 1
+
+
+def revoke_all_sessions(db: Session, user_type: str, principal_id: int) -> int:
+    result = db.execute(
+        update(AuthSession)
+        .where(
+            AuthSession.user_type == user_type,
+            AuthSession.principal_id == principal_id,
+            AuthSession.revoked == False,
+        )
+        .values(revoked=True, revoked_at=datetime.now(timezone.utc))
+    )
+    return result.rowcount
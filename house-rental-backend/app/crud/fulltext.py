@@ -0,0 +1,112 @@
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import column, func, inspect, literal_column, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, Query
+from app.models.house import House
+
+# SQLite keeps its own FTS5 copy of the searchable columns, keyed by house id (rowid).
+# PostgreSQL derives a weighted tsvector from the row itself, so it never drifts.
+FTS_TABLE = "houses_fts"
+PG_SEARCH_COLUMN = "search_vector"
+PG_TS_CONFIG = "english"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _dialect(bind) -> str:
+    return bind.dialect.name
+
+
+def ensure_fulltext_index(engine: Engine):
+    """Create the full-text index for the current backend and backfill it if new."""
+    dialect = _dialect(engine)
+    with engine.begin() as conn:
+        if dialect == "sqlite":
+            if inspect(conn).has_table(FTS_TABLE):
+                return
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                "title, address, city, description, tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+            conn.execute(text(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, address, city, description) "
+                "SELECT id, title, address, city, description FROM houses"
+            ))
+        elif dialect == "postgresql":
+            conn.execute(text(
+                f"ALTER TABLE houses ADD COLUMN IF NOT EXISTS {PG_SEARCH_COLUMN} tsvector "
+                "GENERATED ALWAYS AS ("
+                f"setweight(to_tsvector('{PG_TS_CONFIG}', coalesce(title, '')), 'A') || "
+                f"setweight(to_tsvector('{PG_TS_CONFIG}', coalesce(address, '') || ' ' || coalesce(city, '')), 'B') || "
+                f"setweight(to_tsvector('{PG_TS_CONFIG}', coalesce(description, '')), 'C')"
+                ") STORED"
+            ))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_houses_{PG_SEARCH_COLUMN} "
+                f"ON houses USING GIN ({PG_SEARCH_COLUMN})"
+            ))
+
+
+def index_houses(db: Session, houses: List[House]):
+    if not houses or _dialect(db.get_bind()) != "sqlite":
+        return
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), [{"id": house.id} for house in houses])
+    db.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, address, city, description) "
+            "VALUES (:id, :title, :address, :city, :description)"
+        ),
+        [
+            {
+                "id": house.id,
+                "title": house.title,
+                "address": house.address,
+                "city": house.city,
+                "description": house.description,
+            }
+            for house in houses
+        ],
+    )
+
+
+def unindex_house(db: Session, house_id: int):
+    if _dialect(db.get_bind()) != "sqlite":
+        return
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": house_id})
+
+
+def query_tokens(q: str) -> List[str]:
+    return _TOKEN_RE.findall(q.lower())
+
+
+def apply_fulltext_match(query: Query, q: str) -> Tuple[Query, Optional[object]]:
+    """Restrict `query` to houses matching every term of `q` (as prefixes).
+
+    Returns the filtered query and a rank expression where lower sorts as more
+    relevant, or None when `q` has no searchable terms.
+    """
+    tokens = query_tokens(q)
+    if not tokens:
+        return query, None
+
+    dialect = _dialect(query.session.get_bind())
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery(PG_TS_CONFIG, " & ".join(f"{token}:*" for token in tokens))
+        vector = literal_column(f"houses.{PG_SEARCH_COLUMN}")
+        query = query.filter(vector.op("@@")(ts_query))
+        return query, -func.ts_rank(vector, ts_query)
+
+    if dialect == "sqlite":
+        fts = table(FTS_TABLE, column("rowid"))
+        # Quote every token so user input can never form FTS5 syntax
+        match = " ".join(f'"{token}"*' for token in tokens)
+        query = query.join(fts, fts.c.rowid == House.id).filter(literal_column(FTS_TABLE).op("MATCH")(match))
+        # bm25 weights follow the column order: title, address, city, description
+        return query, literal_column(f"bm25({FTS_TABLE}, 10.0, 4.0, 4.0, 1.0)")
+
+    # No inverted index on other backends; fall back to substring matching
+    for token in tokens:
+        pattern = f"%{token}%"
+        query = query.filter(House.title.ilike(pattern) | House.description.ilike(pattern) | House.address.ilike(pattern))
+    return query, None
@@ -0,0 +1,300 @@
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+from app.core import geo
+from app.core.pagination import decode_cursor, encode_cursor, keyset_page, offset_page
+from app.core.search_engine import house_index
+from app.crud import fulltext
+from app.models.house import House
+from app.models.house_amenity import HouseAmenity, normalize_amenities
+from app.schemas.house import HouseSearch
+
+
+def _search_bounding_box(search: HouseSearch):
+    # Combine the explicit bounding box with the one implied by a radius search
+    boxes = []
+    if search.min_lat is not None or search.max_lat is not None or search.min_lon is not None or search.max_lon is not None:
+        boxes.append((
+            search.min_lat if search.min_lat is not None else -90.0,
+            search.max_lat if search.max_lat is not None else 90.0,
+            search.min_lon if search.min_lon is not None else -180.0,
+            search.max_lon if search.max_lon is not None else 180.0,
+        ))
+    if search.radius_km is not None and search.lat is not None and search.lon is not None:
+        boxes.append(geo.bounding_box(search.lat, search.lon, search.radius_km))
+    if not boxes:
+        return None
+    return (
+        max(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        min(box[3] for box in boxes),
+    )
+
+
+def distance_squared_km(lat: float, lon: float):
+    """Equirectangular squared distance in km² from (lat, lon), as a SQL expression.
+
+    Only uses arithmetic so it runs on any backend; accurate to well under a
+    percent at city scale, which is all ordering and radius filtering need.
+    """
+    lon_scale = geo.km_per_degree_lon(lat)
+    d_lat = (House.latitude - lat) * geo.KM_PER_DEGREE_LAT
+    d_lon = (House.longitude - lon) * lon_scale
+    return d_lat * d_lat + d_lon * d_lon
+
+
+def apply_geo_filters(query: Query, search: HouseSearch) -> Query:
+    box = _search_bounding_box(search)
+    if box is not None:
+        min_lat, max_lat, min_lon, max_lon = box
+        # Narrow via the indexed geohash column first, then trim to the exact box
+        prefixes = geo.covering_prefixes(min_lat, max_lat, min_lon, max_lon)
+        query = query.filter(or_(*[
+            and_(House.geohash >= prefix, House.geohash < prefix + geo.PREFIX_RANGE_END)
+            for prefix in prefixes
+        ]))
+        query = query.filter(
+            House.latitude >= min_lat,
+            House.latitude <= max_lat,
+            House.longitude >= min_lon,
+            House.longitude <= max_lon,
+        )
+
+    if search.radius_km is not None and search.lat is not None and search.lon is not None:
+        query = query.filter(distance_squared_km(search.lat, search.lon) <= search.radius_km ** 2)
+
+    return query
+
+
+def _prefix_match(column, prefix: str):
+    """Case-insensitive prefix match written as a range on lower(column).
+
+    A range, unlike LIKE, can use the functional lower() index on SQLite too.
+    """
+    lower = prefix.strip().lower()
+    if not lower:
+        return True
+    upper = lower[:-1] + chr(ord(lower[-1]) + 1)
+    return and_(func.lower(column) >= lower, func.lower(column) < upper)
+
+
+def apply_search_filters(query: Query, search: HouseSearch) -> Query:
+    if search.available_only:
+        query = query.filter(House.is_available == True)
+
+    if search.city:
+        query = query.filter(_prefix_match(House.city, search.city))
+
+    if search.state:
+        query = query.filter(_prefix_match(House.state, search.state))
+
+    if search.min_price is not None:
+        query = query.filter(House.rent_price >= search.min_price)
+
+    if search.max_price is not None:
+        query = query.filter(House.rent_price <= search.max_price)
+
+    if search.min_bedrooms is not None:
+        query = query.filter(House.bedrooms >= search.min_bedrooms)
+
+    if search.max_bedrooms is not None:
+        query = query.filter(House.bedrooms <= search.max_bedrooms)
+
+    if search.min_bathrooms is not None:
+        query = query.filter(House.bathrooms >= search.min_bathrooms)
+
+    if search.max_bathrooms is not None:
+        query = query.filter(House.bathrooms <= search.max_bathrooms)
+
+    if search.property_type:
+        query = query.filter(House.property_type == search.property_type)
+
+    if search.pet_policy:
+        query = query.filter(House.pet_policy == search.pet_policy)
+
+    if search.parking:
+        query = query.filter(House.parking == search.parking)
+
+    required = normalize_amenities(search.amenities)
+    if required:
+        # Houses having every requested amenity, resolved on the (amenity, house_id) index
+        query = query.filter(House.id.in_(
+            select(HouseAmenity.house_id)
+            .where(HouseAmenity.amenity.in_(required))
+            .group_by(HouseAmenity.house_id)
+            .having(func.count() == len(required))
+        ))
+
+    return apply_geo_filters(query, search)
+
+
+def index_houses(db: Session, houses: List[House]):
+    """Bring secondary search indexes up to date after `houses` were inserted or changed.
+
+    Runs inside the caller's transaction; flush first so every house has an id.
+    """
+    fulltext.index_houses(db, houses)
+    sync_house_amenities(db, houses)
+
+
+def index_house(db: Session, house: House):
+    index_houses(db, [house])
+
+
+def unindex_house(db: Session, house: House):
+    fulltext.unindex_house(db, house.id)
+    db.execute(delete(HouseAmenity).where(HouseAmenity.house_id == house.id))
+
+
+def sync_house_amenities(db: Session, houses: List[House]):
+    db.execute(delete(HouseAmenity).where(HouseAmenity.house_id.in_([house.id for house in houses])))
+    rows = [
+        {"house_id": house.id, "amenity": amenity}
+        for house in houses
+        for amenity in normalize_amenities(house.amenities)
+    ]
+    if rows:
+        db.execute(insert(HouseAmenity), rows)
+
+
+# Lower edges of the price facet buckets; the last bucket is open-ended
+PRICE_BUCKET_EDGES = [0, 1000, 1500, 2000, 2500, 3000, 4000, 5000]
+
+
+def search_cache_key(search: HouseSearch, exclude=("limit", "offset")) -> str:
+    """Canonical form of a search, so equivalent requests share cache entries."""
+    data = search.model_dump(exclude=set(exclude), exclude_none=True)
+    for field in ("city", "state"):
+        if field in data:
+            data[field] = data[field].strip().lower()
+    if "q" in data:
+        data["q"] = " ".join(fulltext.query_tokens(data["q"]))
+    if "amenities" in data:
+        data["amenities"] = normalize_amenities(data["amenities"])
+    return repr(sorted(data.items()))
+
+
+def _price_bucket_label(index: int) -> str:
+    low = PRICE_BUCKET_EDGES[index]
+    if index + 1 < len(PRICE_BUCKET_EDGES):
+        return f"{low}-{PRICE_BUCKET_EDGES[index + 1]}"
+    return f"{low}+"
+
+
+def facet_counts(db: Session, search: HouseSearch) -> dict:
+    price_bucket = case(
+        *[(House.rent_price < edge, index) for index, edge in enumerate(PRICE_BUCKET_EDGES[1:])],
+        else_=len(PRICE_BUCKET_EDGES) - 1,
+    ).label("price_bucket")
+    group_columns = [House.property_type, House.bedrooms, House.pet_policy, House.parking, price_bucket]
+
+    query = db.query(*group_columns, func.count(House.id).label("count"))
+    query = apply_search_filters(query, search)
+    if search.q:
+        query, _ = fulltext.apply_fulltext_match(query, search.q)
+
+    # One GROUP BY over every facet combination, then fold each facet in Python.
+    # The result is bounded by the number of distinct combinations, not rows.
+    totals = {"property_type": {}, "bedrooms": {}, "pet_policy": {}, "parking": {}, "price": {}}
+    total = 0
+    for row in query.group_by(*group_columns).all():
+        total += row.count
+        for facet, value in (
+            ("property_type", row.property_type),
+            ("bedrooms", row.bedrooms),
+            ("pet_policy", row.pet_policy),
+            ("parking", row.parking),
+            ("price", row.price_bucket),
+        ):
+            totals[facet][value] = totals[facet].get(value, 0) + row.count
+
+    def counts(facet):
+        return [
+            {"value": None if value is None else str(value), "count": count}
+            for value, count in sorted(totals[facet].items(), key=lambda item: (item[0] is None, item[0]))
+        ]
+
+    return {
+        "total": total,
+        "property_type": counts("property_type"),
+        "bedrooms": counts("bedrooms"),
+        "pet_policy": counts("pet_policy"),
+        "parking": counts("parking"),
+        "price": [
+            {
+                "value": _price_bucket_label(index),
+                "min_price": PRICE_BUCKET_EDGES[index],
+                "max_price": PRICE_BUCKET_EDGES[index + 1] if index + 1 < len(PRICE_BUCKET_EDGES) else None,
+                "count": count,
+            }
+            for index, count in sorted(totals["price"].items())
+        ],
+    }
+
+
+def _attach_distances(houses: List[House], lat: Optional[float], lon: Optional[float]) -> List[House]:
+    # distance_km is a plain attribute picked up by HouseResponse, not a mapped column
+    for house in houses:
+        if lat is None or lon is None or house.latitude is None or house.longitude is None:
+            house.distance_km = None
+        else:
+            house.distance_km = round(geo.haversine_km(lat, lon, house.latitude, house.longitude), 3)
+    return houses
+
+
+def _sort_key(search: HouseSearch):
+    if search.sort_by == "distance":
+        return distance_squared_km(search.lat, search.lon)
+    if search.sort_by == "price":
+        return House.rent_price
+    return None
+
+
+def _search_with_engine(db: Session, search: HouseSearch, cursor: Optional[str]) -> Tuple[List[House], Optional[str]]:
+    # Filter in memory, then hydrate just the page from the database by primary key
+    after_id = decode_cursor(cursor, "id")[1] if cursor else None
+    ids, has_more = house_index.search(
+        search, search.limit, after_id=after_id, offset=0 if cursor else search.offset
+    )
+    if not ids:
+        return [], None
+    by_id = {house.id: house for house in db.query(House).filter(House.id.in_(ids)).all()}
+    houses = [by_id[house_id] for house_id in ids if house_id in by_id]
+    next_cursor = encode_cursor("id", None, ids[-1]) if has_more and ids else None
+    return _attach_distances(houses, None, None), next_cursor
+
+
+def search_houses(db: Session, search: HouseSearch, cursor: Optional[str] = None) -> Tuple[List[House], Optional[str]]:
+    if house_index.can_serve(search):
+        return _search_with_engine(db, search, cursor)
+
+    query = apply_search_filters(db.query(House), search)
+
+    rank = None
+    if search.q:
+        query, rank = fulltext.apply_fulltext_match(query, search.q)
+
+    if search.sort_by == "distance":
+        query = query.filter(House.latitude.isnot(None), House.longitude.isnot(None))
+
+    if search.sort_by in (None, "relevance") and rank is not None:
+        # Relevance scores have no stable seek key, so this order pages by offset
+        houses, next_cursor = offset_page(
+            query.order_by(rank, House.id),
+            search.limit,
+            cursor=cursor,
+            offset=search.offset,
+            sort="relevance",
+        )
+    else:
+        houses, next_cursor = keyset_page(
+            query,
+            House.id,
+            search.limit,
+            cursor=cursor,
+            offset=search.offset,
+            sort=search.sort_by if search.sort_by not in (None, "relevance") else "id",
+            key_column=_sort_key(search),
+        )
+    return _attach_distances(houses, search.lat, search.lon), next_cursor
@@ -0,0 +1,177 @@
+import csv
+import json
+import math
+from typing import AsyncIterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.core.geo import geohash_for
+from app.crud import house as house_crud
+from app.crud.agent_listing_stats import listing_snapshot, record_listing_changes
+from app.models.house import House
+from app.schemas.house import HouseCreate
+
+# CSV cells for list fields hold several values separated by this character
+CSV_LIST_SEPARATOR = "|"
+LIST_FIELDS = ("amenities", "features", "images")
+
+# A record is (row number, parsed fields or None, error message or None)
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+class ImportStopped(ValueError):
+    """The rest of the body can't be read; batches already committed stay committed."""
+
+
+class ImportLineTooLong(ImportStopped):
+    pass
+
+
+class ImportReport:
+    """Running totals for an import; keeps at most `max_errors` error entries."""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.errors_truncated = False
+        self.stopped = False
+
+    def fail(self, row: int, messages: List[str]):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "errors": messages})
+        else:
+            self.errors_truncated = True
+
+    def stop(self, row: int, message: str):
+        self.stopped = True
+        self.fail(row, [f"{message}; import stopped"])
+
+    def as_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+            "stopped": self.stopped,
+        }
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without holding more than one line."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+        if len(buffer) > max_line_bytes:
+            raise ImportLineTooLong(f"Line longer than {max_line_bytes} bytes")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+def _csv_fields(header: List[str], values: List[str]) -> dict:
+    fields = {}
+    for name, value in zip(header, values):
+        value = value.strip()
+        if value == "":
+            continue  # let the schema default apply
+        if name in LIST_FIELDS:
+            fields[name] = [item.strip() for item in value.split(CSV_LIST_SEPARATOR) if item.strip()]
+        else:
+            fields[name] = value
+    return fields
+
+
+async def iter_csv_records(lines: AsyncIterator[str], max_record_bytes: int) -> AsyncIterator[Record]:
+    header = None
+    pending = None
+    row = 0
+    async for line in lines:
+        record = line if pending is None else f"{pending}\n{line}"
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2:
+            if len(record) > max_record_bytes:
+                raise ImportLineTooLong(f"Record longer than {max_record_bytes} bytes")
+            pending = record
+            continue
+        pending = None
+        if not record.strip():
+            continue
+
+        try:
+            values = next(csv.reader([record]))
+        except csv.Error as e:
+            # e.g. a field longer than csv.field_size_limit()
+            if header is None:
+                raise ImportStopped(f"Unreadable CSV header: {e}")
+            row += 1
+            yield row, None, f"Unreadable CSV row: {e}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, _csv_fields(header, values), None
+
+    if pending is not None:
+        yield row + 1, None, "Unterminated quoted field"
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(value, dict):
+            yield row, None, "Expected a JSON object"
+            continue
+        yield row, value, None
+
+
+def validate_house_row(fields: dict, agent_id: int) -> Tuple[Optional[dict], List[str]]:
+    """Validate one row against HouseCreate; return insertable values or error messages."""
+    try:
+        house = HouseCreate(**{**fields, "agent_id": agent_id})
+    except ValidationError as e:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        ]
+    values = house.model_dump()
+    # Floats parse "inf", "nan" and "1e400", none of which serialize to JSON
+    non_finite = [name for name, value in values.items() if isinstance(value, float) and not math.isfinite(value)]
+    if non_finite:
+        return None, [f"{name}: Input should be a finite number" for name in non_finite]
+    # Core inserts bypass ORM hooks and column defaults on the returned objects
+    values.update(
+        geohash=geohash_for(house.latitude, house.longitude),
+        is_available=True,
+        is_featured=False,
+        views_count=0,
+    )
+    return values, []
+
+
+def insert_house_batch(db: Session, rows: List[dict]) -> List[House]:
+    """Insert `rows` with one executemany, index them and update the agent rollup.
+
+    Runs inside the caller's transaction. Returns detached House objects carrying the inserted values and ids.
+    """
+    ids = db.scalars(insert(House).returning(House.id, sort_by_parameter_order=True), rows).all()
+    houses = [House(id=house_id, **row) for house_id, row in zip(ids, rows)]
+    house_crud.index_houses(db, houses)
+    record_listing_changes(db, [(None, listing_snapshot(house)) for house in houses])
+    return houses
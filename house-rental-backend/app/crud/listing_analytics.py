@@ -0,0 +1,165 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Tuple
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.house import House
+from app.models.listing_analytics import ListingAnalyticsRollup
+
+GRANULARITIES = ("day", "week", "month")
+ALL_TYPES = "*"
+
+# (period_start, property_type) -> [listings, rented, revenue]
+Buckets = Dict[Tuple[date, str], list]
+
+
+def period_start_of(day: date, granularity: str) -> date:
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    return day
+
+
+def next_period(start: date, granularity: str) -> date:
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=7 if granularity == "week" else 1)
+
+
+def periods_between(start: date, end: date, granularity: str) -> List[date]:
+    """Start dates of every period overlapping [start, end]."""
+    periods = []
+    period = period_start_of(start, granularity)
+    while period <= end:
+        periods.append(period)
+        period = next_period(period, granularity)
+    return periods
+
+
+def _truncate(column, granularity: str, dialect: str):
+    if dialect == "postgresql":
+        return cast(func.date_trunc(granularity, column), Date)
+    # SQLite: date modifiers; 'weekday 0' moves to Sunday, then back to its Monday
+    if granularity == "month":
+        return func.strftime("%Y-%m-01", column)
+    if granularity == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    return func.date(column)
+
+
+def _as_date(value) -> date:
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+    return (
+        datetime.combine(start, time.min, tzinfo=timezone.utc),
+        datetime.combine(end, time.min, tzinfo=timezone.utc),
+    )
+
+
+def compute_buckets(db: Session, granularity: str, start: date, end: date) -> Buckets:
+    """Group houses into periods in [start, end) with two GROUP BY queries.
+
+    Listings count by created_at. Rented revenue counts unavailable houses
+    by rented_at, which only moves when a house becomes unavailable, so
+    editing a rented house leaves its revenue in the period already stored.
+    """
+    dialect = db.get_bind().dialect.name
+    lower, upper = _bounds(start, end)
+    buckets: Buckets = defaultdict(lambda: [0, 0, 0.0])
+
+    created_period = _truncate(House.created_at, granularity, dialect)
+    listings = db.execute(
+        select(created_period, House.property_type, func.count(House.id))
+        .where(House.created_at >= lower, House.created_at < upper)
+        .group_by(created_period, House.property_type)
+    )
+    for period, property_type, count in listings:
+        buckets[(_as_date(period), property_type)][0] += count
+
+    rented_period = _truncate(House.rented_at, granularity, dialect)
+    rentals = db.execute(
+        select(rented_period, House.property_type, func.count(House.id), func.sum(House.rent_price))
+        .where(House.is_available == False, House.rented_at >= lower, House.rented_at < upper)
+        .group_by(rented_period, House.property_type)
+    )
+    for period, property_type, count, revenue in rentals:
+        bucket = buckets[(_as_date(period), property_type)]
+        bucket[1] += count
+        bucket[2] += revenue or 0.0
+
+    for (period, _), (listed, rented, revenue) in list(buckets.items()):
+        total = buckets[(period, ALL_TYPES)]
+        total[0] += listed
+        total[1] += rented
+        total[2] += revenue
+    return buckets
+
+
+def _store_closed_periods(db: Session, granularity: str, periods: List[date]):
+    buckets = compute_buckets(db, granularity, periods[0], next_period(periods[-1], granularity))
+    wanted = set(periods)
+    rows = [
+        ListingAnalyticsRollup(
+            granularity=granularity, period_start=period, property_type=property_type,
+            listings=listed, rented=rented, revenue=revenue,
+        )
+        for (period, property_type), (listed, rented, revenue) in buckets.items()
+        if period in wanted and property_type != ALL_TYPES
+    ]
+    # The totals row is written even for empty periods so they are not recomputed
+    for period in periods:
+        listed, rented, revenue = buckets.get((period, ALL_TYPES), (0, 0, 0.0))
+        rows.append(ListingAnalyticsRollup(
+            granularity=granularity, period_start=period, property_type=ALL_TYPES,
+            listings=listed, rented=rented, revenue=revenue,
+        ))
+    db.add_all(rows)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request stored the same periods first; theirs are as good
+        db.rollback()
+
+
+def listing_analytics(db: Session, granularity: str, start: date, end: date) -> Buckets:
+    """Buckets for every period overlapping [start, end].
+
+    Closed periods come from the rollup table and are computed on first
+    use; the current period (and any later ones) is always computed live.
+    """
+    periods = periods_between(start, end, granularity)
+    current = period_start_of(datetime.now(timezone.utc).date(), granularity)
+    closed = [period for period in periods if period < current]
+
+    def stored_rows():
+        if not closed:
+            return []
+        return db.query(ListingAnalyticsRollup).filter(
+            ListingAnalyticsRollup.granularity == granularity,
+            ListingAnalyticsRollup.period_start >= closed[0],
+            ListingAnalyticsRollup.period_start <= closed[-1],
+        ).all()
+
+    rows = stored_rows()
+    computed = {row.period_start for row in rows if row.property_type == ALL_TYPES}
+    missing = [period for period in closed if period not in computed]
+    if missing:
+        _store_closed_periods(db, granularity, missing)
+        rows = stored_rows()
+
+    buckets: Buckets = {
+        (row.period_start, row.property_type): [row.listings, row.rented, row.revenue] for row in rows
+    }
+    open_periods = [period for period in periods if period >= current]
+    if open_periods:
+        live = compute_buckets(db, granularity, open_periods[0], next_period(open_periods[-1], granularity))
+        buckets.update(live)
+    return buckets
@@ -1,18 +1,102 @@
+from datetime import datetime, timezone
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.pool_metrics import PoolMetrics, instrumented_pool_class
+from app.database.sqlite import (
+    WriterRoutingSession, apply_performance_pragmas, is_memory_database, use_immediate_transactions
+)
+
+
+def pool_options(database_url: str, pool_class: type, pool_size: int = None, max_overflow: int = None) -> dict:
+    """Pool arguments from settings; in-memory SQLite keeps SQLAlchemy's single-connection pool."""
+    if is_memory_database(make_url(database_url)):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(pool_class, PoolMetrics()),
+        "pool_size": settings.DB_POOL_SIZE if pool_size is None else pool_size,
+        "max_overflow": settings.DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+connect_args = {"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+sqlite_performance_mode = (
+    settings.SQLITE_PERFORMANCE_MODE
+    and make_url(settings.DATABASE_URL).get_backend_name() == "sqlite"
+    and not is_memory_database(make_url(settings.DATABASE_URL))
+)
 
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    connect_args=connect_args,
+    **pool_options(settings.DATABASE_URL, QueuePool)
+)
+
+# Async drivers for the same database, picked from the DATABASE_URL dialect
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(database_url: str):
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **pool_options(settings.DATABASE_URL, AsyncAdaptedQueuePool)
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if sqlite_performance_mode:
+    # One write connection per engine; writers wait in the pool queue for it
+    writer_engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args=connect_args,
+        **pool_options(settings.DATABASE_URL, QueuePool, pool_size=1, max_overflow=0)
+    )
+    async_writer_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        **pool_options(settings.DATABASE_URL, AsyncAdaptedQueuePool, pool_size=1, max_overflow=0)
+    )
+    for sync_engine in (engine, writer_engine, async_engine.sync_engine, async_writer_engine.sync_engine):
+        apply_performance_pragmas(sync_engine)
+    for sync_engine in (writer_engine, async_writer_engine.sync_engine):
+        use_immediate_transactions(sync_engine)
+
+    SessionLocal = sessionmaker(
+        class_=WriterRoutingSession, reader=engine, writer=writer_engine,
+        autocommit=False, autoflush=False,
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        sync_session_class=WriterRoutingSession,
+        reader=async_engine.sync_engine, writer=async_writer_engine.sync_engine,
+        autoflush=False, expire_on_commit=False,
+    )
+else:
+    writer_engine = engine
+    async_writer_engine = async_engine
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    # Objects stay loaded after commit: an AsyncSession can't lazily reload expired attributes
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
 
+def utc_now() -> datetime:
+    # Set in Python so timestamps keep their microseconds; SQLite's CURRENT_TIMESTAMP stops at the second
+    return datetime.now(timezone.utc)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -20,3 +104,8 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    # Request handlers use this one; get_db remains for scripts and worker threads
+    async with AsyncSessionLocal() as db:
+        yield db
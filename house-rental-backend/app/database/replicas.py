@@ -0,0 +1,88 @@
+"""Read-replica routing for read-only routes.
+
+Routes that only read take `get_read_db`, which hands out a session on the
+next replica in DATABASE_REPLICA_URLS. A client that wrote recently reads
+from the primary instead, so it doesn't miss its own change while the
+replicas catch up.
+"""
+
+import hashlib
+import itertools
+import math
+import time
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.database.database import AsyncSessionLocal, async_database_url, pool_options
+
+STICKY_COOKIE = "read_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReplicaRouter:
+    """Picks replicas round-robin, or the primary for clients that just wrote.
+
+    Recent writers are remembered with a cookie, which every worker process
+    sees, and in a per-process cache keyed by credentials (or IP) for
+    clients that don't keep cookies.
+    """
+
+    def __init__(self, primary, replicas: list, sticky_seconds: float, max_clients: int):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self._next_replica = itertools.cycle(replicas)
+        self.recent_writers = LRUCache(maxsize=max_clients, ttl=sticky_seconds)
+
+    @staticmethod
+    def client_key(request: Request) -> str:
+        authorization = request.headers.get("authorization")
+        if authorization:
+            return "auth:" + hashlib.sha256(authorization.encode()).hexdigest()
+        return "ip:" + (request.client.host if request.client else "unknown")
+
+    def mark_writer(self, request: Request, response: Response):
+        if not self.replicas:
+            return
+        self.recent_writers.set(self.client_key(request), True)
+        response.set_cookie(
+            STICKY_COOKIE,
+            f"{time.time() + self.sticky_seconds:.3f}",
+            max_age=math.ceil(self.sticky_seconds),
+            httponly=True,
+            samesite="lax",
+        )
+
+    def is_sticky(self, request: Request) -> bool:
+        try:
+            if float(request.cookies.get(STICKY_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        return self.recent_writers.get(self.client_key(request)) is not None
+
+    def session_factory(self, request: Request):
+        if not self.replicas or self.is_sticky(request):
+            return self.primary
+        return next(self._next_replica)
+
+
+replica_engines = [
+    create_async_engine(async_database_url(url), **pool_options(url, AsyncAdaptedQueuePool))
+    for url in settings.DATABASE_REPLICA_URLS
+]
+
+replica_router = ReplicaRouter(
+    AsyncSessionLocal,
+    [async_sessionmaker(replica, autoflush=False, expire_on_commit=False) for replica in replica_engines],
+    sticky_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    max_clients=settings.READ_YOUR_WRITES_MAX_CLIENTS,
+)
+
+
+async def get_read_db(request: Request):
+    # For routes that never write; anything else stays on get_async_db
+    async with replica_router.session_factory(request)() as db:
+        yield db
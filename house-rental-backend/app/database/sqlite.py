@@ -0,0 +1,88 @@
+"""SQLite performance mode: WAL, tuned pragmas and a single writer connection.
+
+Readers and the writer work concurrently under WAL, so reads go through the
+normal pool while every write goes through one dedicated connection per
+engine. Writers queue for that connection instead of racing for the
+database lock and failing with "database is locked".
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from app.core.config import settings
+
+WRITE_VERBS = {"INSERT", "UPDATE", "DELETE", "REPLACE"}
+
+
+def is_memory_database(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def apply_performance_pragmas(engine: Engine):
+    pragmas = (
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KIB}",  # negative means KiB, not pages
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def use_immediate_transactions(engine: Engine):
+    """Start every transaction with BEGIN IMMEDIATE, taking the write lock up front.
+
+    A deferred transaction that reads and then writes can hit a lock it cannot
+    wait for (another writer committed since its read); an immediate one
+    waits out busy_timeout instead.
+    """
+
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        # Stop the driver's own lazy BEGIN so the "begin" hook below decides
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin_immediate(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def is_write(clause) -> bool:
+    if isinstance(clause, UpdateBase):
+        return True
+    if isinstance(clause, TextClause):
+        verb = clause.text.lstrip()[:7].upper()
+        return any(verb.startswith(write_verb) for write_verb in WRITE_VERBS)
+    return False
+
+
+class WriterRoutingSession(Session):
+    """Reads on `reader`, writes on `writer`.
+
+    Once a transaction writes it stays on the writer until it ends, so it
+    reads its own uncommitted changes.
+    """
+
+    def __init__(self, *args, reader: Engine, writer: Engine, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reader = reader
+        self.writer = writer
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or is_write(clause):
+            self.info["writing"] = True
+        return self.writer if self.info.get("writing") else self.reader
+
+
+@event.listens_for(WriterRoutingSession, "after_transaction_end")
+def _release_writer(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("writing", None)
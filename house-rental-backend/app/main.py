@@ -1,7 +1,19 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Request
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.database.database import engine, Base
+from app.database.database import async_engine, async_writer_engine, engine, writer_engine, Base
+from app.database.replicas import SAFE_METHODS, replica_engines, replica_router
+from app.core.admin_stats import refresh_admin_stats_periodically
+from app.core.pool_metrics import pool_stats
+from app.core.sql_instrumentation import (
+    RequestQueryStats, current_query_stats, report_repeated_queries, report_streamed_queries
+)
+from app.core.search_engine import rebuild_house_index, refresh_house_index_periodically
+from app.core.write_behind import activity_log, view_counts
+from app.crud.fulltext import ensure_fulltext_index
+from app.routers.houses import facets_cache, search_cache
 from app.routers import (
     auth_router,
     users_router,
@@ -15,6 +27,7 @@ from app.routers import (
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+ensure_fulltext_index(writer_engine)
 
 # Create FastAPI app
 app = FastAPI(
@@ -36,6 +49,44 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+@app.middleware("http")
+async def remember_recent_writers(request: Request, call_next):
+    # Successful writes pin the client's reads to the primary for a few seconds
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        replica_router.mark_writer(request, response)
+    return response
+
+
+@app.middleware("http")
+async def instrument_sql(request: Request, call_next):
+    # Count this request's queries, including those run from widget threads
+    if not settings.SQL_INSTRUMENTATION_ENABLED:
+        return await call_next(request)
+    stats = RequestQueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        current_query_stats.reset(token)
+    if "content-length" in response.headers:
+        response.headers.append("Server-Timing", stats.server_timing())
+        report_repeated_queries(stats, request.method, request.url.path)
+        return response
+
+    # A streamed body (the exports) queries after the headers are sent, so
+    # it gets no Server-Timing; its totals are logged once the body ends
+    body = response.body_iterator
+
+    async def body_then_report():
+        async for chunk in body:
+            yield chunk
+        report_streamed_queries(stats, request.method, request.url.path)
+
+    response.body_iterator = body_then_report()
+    return response
+
+
 # Include routers
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(users_router, prefix="/api/v1")
@@ -47,6 +98,42 @@ app.include_router(furniture_requests_router, prefix="/api/v1")
 app.include_router(dashboard_router, prefix="/api/v1")
 
 
+@app.on_event("startup")
+async def start_write_behind_buffers():
+    view_counts.start()
+    activity_log.start()
+
+
+@app.on_event("shutdown")
+async def flush_write_behind_buffers():
+    await run_in_threadpool(view_counts.stop)
+    await run_in_threadpool(activity_log.stop)
+
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await async_engine.dispose()
+    if async_writer_engine is not async_engine:
+        await async_writer_engine.dispose()
+    for replica_engine in replica_engines:
+        await replica_engine.dispose()
+
+
+@app.on_event("startup")
+async def start_search_engine():
+    if not settings.SEARCH_ENGINE_ENABLED:
+        return
+    await run_in_threadpool(rebuild_house_index)
+    if settings.SEARCH_ENGINE_REFRESH_SECONDS > 0:
+        asyncio.create_task(refresh_house_index_periodically(settings.SEARCH_ENGINE_REFRESH_SECONDS))
+
+
+@app.on_event("startup")
+async def start_admin_stats_refresh():
+    if settings.ADMIN_STATS_REFRESH_SECONDS > 0:
+        asyncio.create_task(refresh_admin_stats_periodically(settings.ADMIN_STATS_REFRESH_SECONDS))
+
+
 @app.get("/")
 async def root():
     return {
@@ -61,6 +148,30 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/cache")
+async def cache_health():
+    return {
+        "search": search_cache.stats(),
+        "facets": facets_cache.stats(),
+    }
+
+
+@app.get("/health/db")
+async def database_health():
+    # Per worker process; null for an engine without a configurable pool (in-memory SQLite)
+    pools = {
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(async_engine.sync_engine.pool),
+    }
+    if writer_engine is not engine:
+        # SQLite performance mode: waits here are writers queueing for the write connection
+        pools["sync_writer"] = pool_stats(writer_engine.pool)
+        pools["async_writer"] = pool_stats(async_writer_engine.sync_engine.pool)
+    if replica_engines:
+        pools["replicas"] = [pool_stats(replica_engine.sync_engine.pool) for replica_engine in replica_engines]
+    return pools
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,7 +1,12 @@
 from .user import User
 from .agent import Agent
 from .house import House
+from .house_amenity import HouseAmenity
 from .furniture_request import FurnitureRequest
+from .agent_listing_stats import AgentListingStats
+from .listing_analytics import ListingAnalyticsRollup
+from .activity_event import ActivityEvent
+from .auth_session import AuthSession
 
-__all__ = ["User", "Agent", "House", "FurnitureRequest"]
+__all__ = ["User", "Agent", "House", "HouseAmenity", "FurnitureRequest", "AgentListingStats", "ListingAnalyticsRollup", "ActivityEvent", "AuthSession"]
 
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, JSON, Index
+from app.database.database import Base
+
+
+class ActivityEvent(Base):
+    """Append-only log of writes, read newest-first per agent.
+
+    Rows are inserted in batches by the activity write-behind buffer, so
+    created_at is the time of the write itself, not of the insert.
+    """
+    __tablename__ = "activity_events"
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    agent_id = Column(Integer, nullable=True)  # whose feed the event belongs to; no FK, the log outlives rows
+    actor_type = Column(String, nullable=True)  # "user", "agent" or None for anonymous writes
+    actor_id = Column(Integer, nullable=True)
+    event_type = Column(String, nullable=False)  # e.g. "house_created", "review_deleted"
+    target_type = Column(String, nullable=True)
+    target_id = Column(Integer, nullable=True)
+    payload = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# Tail reads: WHERE agent_id = ? ORDER BY created_at DESC, id DESC LIMIT n
+Index(
+    "ix_activity_events_agent_id_created_at_id",
+    ActivityEvent.agent_id,
+    ActivityEvent.created_at.desc(),
+    ActivityEvent.id.desc(),
+)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+
+class AgentListingStats(Base):
+    """Per-agent listing counts kept in step with the houses table.
+
+    Updated by deltas on every house write (see app.crud.agent_listing_stats);
+    rebuild_agent_listing_stats.py recomputes it from scratch if it drifts.
+    """
+    __tablename__ = "agent_listing_stats"
+
+    agent_id = Column(Integer, ForeignKey("agents.id", ondelete="CASCADE"), primary_key=True)
+    total_properties = Column(Integer, nullable=False, default=0)
+    available_properties = Column(Integer, nullable=False, default=0)
+    rented_properties = Column(Integer, nullable=False, default=0)
+    rented_revenue = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
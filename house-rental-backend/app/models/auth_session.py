@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+
+class AuthSession(Base):
+    """A refresh token: one row per login, replaced by a new row on every refresh."""
+    __tablename__ = "auth_sessions"
+    __table_args__ = (
+        # Revoking every session of an account
+        Index("ix_auth_sessions_principal", "user_type", "principal_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)  # sha256 of the token; the token itself is never stored
+    user_type = Column(String, nullable=False)  # "user" or "agent"
+    principal_id = Column(Integer, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,11 +1,17 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Float, JSON, ForeignKey, Index, event, inspect
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.database.database import Base
+from app.database.database import Base, utc_now
+from app.core.geo import geohash_for
 
 
 class House(Base):
     __tablename__ = "houses"
+    __table_args__ = (
+        # Keyset pagination seeks on (sort key, id)
+        Index("ix_houses_agent_id_id", "agent_id", "id"),
+        Index("ix_houses_rent_price_id", "rent_price", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False, index=True)
@@ -19,6 +25,7 @@ class House(Base):
     country = Column(String, default="USA")
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
+    geohash = Column(String, nullable=True, index=True)  # derived from latitude/longitude
     
     # Property Details
     property_type = Column(String, nullable=False)  # apartment, house, condo, townhouse
@@ -34,6 +41,7 @@ class House(Base):
     lease_term = Column(String, nullable=True)  # "12 months", "month-to-month", etc.
     available_date = Column(DateTime, nullable=True)
     is_available = Column(Boolean, default=True)
+    rented_at = Column(DateTime(timezone=True), nullable=True)  # when is_available last became False
     
     # Features and Amenities
     amenities = Column(JSON, nullable=True)  # List of amenities
@@ -52,9 +60,31 @@ class House(Base):
     # Metadata
     views_count = Column(Integer, default=0)
     is_featured = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utc_now, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=utc_now)
 
     # Relationships
     agent = relationship("Agent", back_populates="houses")
 
+
+# City and state filters are case-insensitive prefix matches on these
+Index("ix_houses_city_lower", func.lower(House.city))
+Index("ix_houses_state_lower", func.lower(House.state))
+
+
+@event.listens_for(House, "before_insert")
+@event.listens_for(House, "before_update")
+def _sync_geohash(mapper, connection, target):
+    # Keep the spatial index column in step with the coordinates on every ORM write
+    target.geohash = geohash_for(target.latitude, target.longitude)
+
+
+@event.listens_for(House, "before_insert")
+@event.listens_for(House, "before_update")
+def _stamp_rented_at(mapper, connection, target):
+    # Analytics count a rental in the period it happened; later edits must not move it
+    if target.is_available is False:
+        if target.rented_at is None or inspect(target).attrs.is_available.history.has_changes():
+            target.rented_at = utc_now()
+    elif target.rented_at is not None:
+        target.rented_at = None
@@ -0,0 +1,24 @@
+from typing import List, Optional, Union
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.database.database import Base
+
+
+class HouseAmenity(Base):
+    """One row per (house, amenity), mirroring House.amenities so it can be indexed."""
+    __tablename__ = "house_amenities"
+    __table_args__ = (
+        # Amenity lookups go amenity -> house ids without touching the houses table
+        Index("ix_house_amenities_amenity_house_id", "amenity", "house_id"),
+    )
+
+    house_id = Column(Integer, ForeignKey("houses.id", ondelete="CASCADE"), primary_key=True)
+    amenity = Column(String, primary_key=True)
+
+
+def normalize_amenities(amenities: Optional[Union[List[str], str]]) -> List[str]:
+    # Older rows store a comma-separated string instead of a list
+    if not amenities:
+        return []
+    if isinstance(amenities, str):
+        amenities = amenities.split(",")
+    return sorted({name.strip().lower() for name in amenities if name and name.strip()})
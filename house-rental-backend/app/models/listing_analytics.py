@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+
+class ListingAnalyticsRollup(Base):
+    """New listings and rented revenue per (granularity, period, property type).
+
+    Only closed periods are stored; each is computed once. The row with
+    property_type "*" holds the period's totals and marks it as computed.
+    """
+    __tablename__ = "listing_analytics_rollups"
+
+    granularity = Column(String, primary_key=True)  # "day", "week" or "month"
+    period_start = Column(Date, primary_key=True)
+    property_type = Column(String, primary_key=True)
+    listings = Column(Integer, nullable=False, default=0)
+    rented = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
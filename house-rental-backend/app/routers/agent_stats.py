@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import get_async_db
 from app.schemas.agent_stats import AgentStatsResponse
 from app.crud.agent_stats import get_agent_stats, create_agent_stats, update_agent_stats, delete_agent_stats
 
@@ -12,8 +12,8 @@ router = APIRouter(prefix="/agent-stats", tags=["agent-stats"])
     summary="Get agent stats",
     description="Retrieve statistics for a specific agent by agent_id."
 )
-def read_agent_stats(agent_id: int, db: Session = Depends(get_db)):
-    stats = get_agent_stats(db, agent_id)
+async def read_agent_stats(agent_id: int, db: AsyncSession = Depends(get_async_db)):
+    stats = await db.run_sync(get_agent_stats, agent_id)
     if not stats:
         raise HTTPException(status_code=404, detail="Agent stats not found")
     return stats
@@ -25,8 +25,8 @@ def read_agent_stats(agent_id: int, db: Session = Depends(get_db)):
     summary="Create agent stats",
     description="Create statistics for a specific agent by agent_id."
 )
-def create_stats(agent_id: int, stats: AgentStatsResponse, db: Session = Depends(get_db)):
-    db_stats = create_agent_stats(db, agent_id, stats.dict(exclude_unset=True))
+async def create_stats(agent_id: int, stats: AgentStatsResponse, db: AsyncSession = Depends(get_async_db)):
+    db_stats = await db.run_sync(create_agent_stats, agent_id, stats.dict(exclude_unset=True))
     return db_stats
 
 @router.put(
@@ -35,8 +35,8 @@ def create_stats(agent_id: int, stats: AgentStatsResponse, db: Session = Depends
     summary="Update agent stats",
     description="Update statistics for a specific agent by agent_id."
 )
-def update_stats(agent_id: int, stats: AgentStatsResponse, db: Session = Depends(get_db)):
-    db_stats = update_agent_stats(db, agent_id, stats.dict(exclude_unset=True))
+async def update_stats(agent_id: int, stats: AgentStatsResponse, db: AsyncSession = Depends(get_async_db)):
+    db_stats = await db.run_sync(update_agent_stats, agent_id, stats.dict(exclude_unset=True))
     if not db_stats:
         raise HTTPException(status_code=404, detail="Agent stats not found")
     return db_stats
@@ -47,8 +47,8 @@ def update_stats(agent_id: int, stats: AgentStatsResponse, db: Session = Depends
     summary="Delete agent stats",
     description="Delete statistics for a specific agent by agent_id."
 )
-def delete_stats(agent_id: int, db: Session = Depends(get_db)):
-    deleted = delete_agent_stats(db, agent_id)
+async def delete_stats(agent_id: int, db: AsyncSession = Depends(get_async_db)):
+    deleted = await db.run_sync(delete_agent_stats, agent_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Agent stats not found")
     return
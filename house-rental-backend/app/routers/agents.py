@@ -1,22 +1,26 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from app.database.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.database.database import get_async_db
+from app.database.replicas import get_read_db
 from app.models.agent import Agent
 from app.schemas.agent import AgentCreate, AgentUpdate, AgentResponse
-from app.core.security import get_password_hash, get_current_active_user
+from app.core.security import hash_password, get_current_active_user, invalidate_principal
+from app.core.http_cache import conditional_response, last_modified_of, list_validators, make_etag
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 
 
 @router.post("/", response_model=AgentResponse, status_code=status.HTTP_201_CREATED)
-async def create_agent(agent: AgentCreate, db: Session = Depends(get_db)):
+async def create_agent(agent: AgentCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if agent already exists
-    db_agent = db.query(Agent).filter(
-        (Agent.email == agent.email) | 
-        (Agent.username == agent.username) | 
-        (Agent.license_number == agent.license_number)
-    ).first()
+    db_agent = await db.scalar(select(Agent).where(or_(
+        Agent.email == agent.email,
+        Agent.username == agent.username,
+        Agent.license_number == agent.license_number
+    )).limit(1))
     if db_agent:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -24,7 +28,7 @@ async def create_agent(agent: AgentCreate, db: Session = Depends(get_db)):
         )
     
     # Create new agent
-    hashed_password = get_password_hash(agent.password)
+    hashed_password = await hash_password(agent.password)
     db_agent = Agent(
         email=agent.email,
         username=agent.username,
@@ -39,8 +43,8 @@ async def create_agent(agent: AgentCreate, db: Session = Depends(get_db)):
         hashed_password=hashed_password
     )
     db.add(db_agent)
-    db.commit()
-    db.refresh(db_agent)
+    await db.commit()
+    await db.refresh(db_agent)
     return db_agent
 
 
@@ -58,7 +62,7 @@ async def read_agent_me(current_user: Agent = Depends(get_current_active_user)):
 async def update_agent_me(
     agent_update: AgentUpdate,
     current_user: Agent = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not isinstance(current_user, Agent):
         raise HTTPException(
@@ -67,41 +71,57 @@ async def update_agent_me(
         )
     
     # Update agent fields
+    username = current_user.username
     update_data = agent_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    # Drop the cached identity (under the old username if it changed)
+    invalidate_principal("agent", username)
     return current_user
 
 
 @router.get("/{agent_id}", response_model=AgentResponse)
-async def read_agent(agent_id: int, db: Session = Depends(get_db)):
-    db_agent = db.query(Agent).filter(Agent.id == agent_id).first()
+async def read_agent(agent_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
+    db_agent = await db.get(Agent, agent_id)
     if db_agent is None:
         raise HTTPException(status_code=404, detail="Agent not found")
+
+    last_modified = last_modified_of(db_agent)
+    not_modified = conditional_response(request, response, make_etag("agent", agent_id, last_modified), last_modified)
+    if not_modified is not None:
+        return not_modified
     return db_agent
 
 
 @router.get("/", response_model=List[AgentResponse])
 async def read_agents(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     city: str = None,
     specialty: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(Agent)
+    query = select(Agent)
     
     if city:
-        query = query.filter(Agent.service_areas.contains([city]))
+        query = query.where(Agent.service_areas.contains([city]))
     
     if specialty:
-        query = query.filter(Agent.specialties.contains([specialty]))
+        query = query.where(Agent.specialties.contains([specialty]))
     
-    agents = query.offset(skip).limit(limit).all()
-    return agents
+    count, last_modified = await list_validators(db, query, Agent)
+    etag = make_etag("agents", request.url.query, count, last_modified)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    agents = await db.scalars(query.offset(skip).limit(limit))
+    return agents.all()
 
 
 # @router.get("/{agent_id}", response_model=AgentResponse)
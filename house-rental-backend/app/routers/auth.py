@@ -1,71 +1,171 @@
+import math
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.database.database import get_db
+from sqlalchemy import case, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import get_async_db
 from app.models.user import User
 from app.models.agent import Agent
-from app.schemas.token import Token
+from app.schemas.token import Principal, RefreshRequest, Token
 from app.schemas.user import UserLogin
 from app.schemas.agent import AgentLogin
-from app.core.security import verify_password, create_access_token
+from app.core.security import (
+    verify_and_update_password, verify_dummy_password, create_access_token, get_current_principal
+)
 from app.core.config import settings
+from app.core.rate_limit import TokenBucketLimiter
+from app.crud.auth_session import create_session, get_session, is_expired, revoke_all_sessions, revoke_session
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
+login_ip_limiter = TokenBucketLimiter(
+    burst=settings.LOGIN_IP_BURST,
+    rate_per_minute=settings.LOGIN_IP_PER_MINUTE,
+    max_keys=settings.LOGIN_LIMITER_MAX_KEYS,
+)
+login_account_limiter = TokenBucketLimiter(
+    burst=settings.LOGIN_ACCOUNT_BURST,
+    rate_per_minute=settings.LOGIN_ACCOUNT_PER_MINUTE,
+    max_keys=settings.LOGIN_LIMITER_MAX_KEYS,
+)
 
-def authenticate_user(db: Session, username: str, password: str):
-    # Try to find user by username first, then by email
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        user = db.query(User).filter(User.email == username).first()
-    if not user:
-        return False
-    if not verify_password(password, user.hashed_password):
+
+async def _authenticate(db: AsyncSession, model, username: str, password: str):
+    # One lookup by username or email; an exact username match wins if both hit
+    account = await db.scalar(select(model).where(
+        or_(model.username == username, model.email == username)
+    ).order_by(case((model.username == username, 0), else_=1)).limit(1))
+    if not account:
+        return await verify_dummy_password(password)
+    verified, new_hash = await verify_and_update_password(password, account.hashed_password)
+    if not verified:
         return False
-    return user
+    if new_hash:
+        # Stored hash predates the current CryptContext settings
+        account.hashed_password = new_hash
+        await db.commit()
+    return account
 
 
-def authenticate_agent(db: Session, username: str, password: str):
-    # Try to find agent by username first, then by email
-    agent = db.query(Agent).filter(Agent.username == username).first()
-    if not agent:
-        agent = db.query(Agent).filter(Agent.email == username).first()
-    if not agent:
-        return False
-    if not verify_password(password, agent.hashed_password):
-        return False
-    return agent
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    return await _authenticate(db, User, username, password)
+
+
+async def authenticate_agent(db: AsyncSession, username: str, password: str):
+    return await _authenticate(db, Agent, username, password)
+
+
+def check_login_rate(request: Request, user_type: str, username: str):
+    """Reject floods per client IP and per account name before any bcrypt work."""
+    client_ip = request.client.host if request.client else "unknown"
+    for limiter, key in (
+        (login_ip_limiter, client_ip),
+        (login_account_limiter, (user_type, username.strip().lower())),
+    ):
+        allowed, retry_after = limiter.acquire(key)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, please try again later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+
+async def issue_tokens(db: AsyncSession, user_type: str, principal_id: int, username: str) -> dict:
+    """A short-lived access token plus a refresh token for a new session; the caller commits."""
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": username, "user_type": user_type}, expires_delta=access_token_expires
+    )
+    refresh_token = await db.run_sync(create_session, user_type, principal_id)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
 
 @router.post("/user/login", response_model=Token)
-async def login_user(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, user_credentials.username, user_credentials.password)
+async def login_user(user_credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
+    check_login_rate(request, "user", user_credentials.username)
+    user = await authenticate_user(db, user_credentials.username, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username, "user_type": "user"}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    tokens = await issue_tokens(db, "user", user.id, user.username)
+    await db.commit()
+    return tokens
 
 
 @router.post("/agent/login", response_model=Token)
-async def login_agent(agent_credentials: AgentLogin, db: Session = Depends(get_db)):
-    agent = authenticate_agent(db, agent_credentials.username, agent_credentials.password)
+async def login_agent(agent_credentials: AgentLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
+    check_login_rate(request, "agent", agent_credentials.username)
+    agent = await authenticate_agent(db, agent_credentials.username, agent_credentials.password)
     if not agent:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": agent.username, "user_type": "agent"}, expires_delta=access_token_expires
+    tokens = await issue_tokens(db, "agent", agent.id, agent.username)
+    await db.commit()
+    return tokens
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(body: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """Swap a refresh token for new tokens without a password check.
+
+    Refresh tokens are single-use: each call revokes the presented token
+    and returns a new one.
+    """
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    session = await db.run_sync(get_session, body.refresh_token)
+    if session is None:
+        raise invalid_token
+    if session.revoked:
+        # A rotated-out token came back, so it probably leaked; end every session of the account
+        await db.run_sync(revoke_all_sessions, session.user_type, session.principal_id)
+        await db.commit()
+        raise invalid_token
+    if is_expired(session):
+        raise invalid_token
+
+    model = User if session.user_type == "user" else Agent
+    result = await db.execute(
+        select(model.id, model.username, model.is_active).where(model.id == session.principal_id)
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    account = result.first()
+    if account is None or not account.is_active:
+        await db.run_sync(revoke_session, session.id)
+        await db.commit()
+        raise invalid_token
+
+    if not await db.run_sync(revoke_session, session.id):
+        # A concurrent refresh already rotated this token
+        await db.rollback()
+        raise invalid_token
+    tokens = await issue_tokens(db, session.user_type, account.id, account.username)
+    await db.commit()
+    return tokens
+
+
+@router.post("/logout")
+async def logout(body: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    # Ends the refresh session; access tokens already issued last until they expire
+    session = await db.run_sync(get_session, body.refresh_token)
+    if session is not None:
+        await db.run_sync(revoke_session, session.id)
+        await db.commit()
+    return {"message": "Logged out successfully"}
+
 
+@router.post("/logout-all")
+async def logout_all(principal: Principal = Depends(get_current_principal), db: AsyncSession = Depends(get_async_db)):
+    revoked = await db.run_sync(revoke_all_sessions, principal.user_type, principal.id)
+    await db.commit()
+    return {"message": "Logged out of all sessions", "revoked_sessions": revoked}
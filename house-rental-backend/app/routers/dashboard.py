@@ -1,40 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
 
-from app.database.database import get_db
-from app.core.security import get_current_user, get_current_agent, get_current_admin
+from app.database.database import SessionLocal, get_async_db
+from app.core.security import get_current_user, get_agent_principal, get_current_admin
+from app.core.admin_stats import admin_stats
+from app.core.export import export_response
+from app.core.pagination import InvalidCursor
+from app.core.config import settings
+from app.crud.activity import activity_item, recent_activity
+from app.crud.listing_analytics import ALL_TYPES, listing_analytics, period_start_of, periods_between
 from app.models.user import User
 from app.models.agent import Agent
+from app.models.agent_listing_stats import AgentListingStats
 from app.models.house import House
 from app.models.furniture_request import FurnitureRequest
+from app.schemas.token import Principal
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
-@router.get("/agent/stats")
-async def get_agent_stats(current_agent: Agent = Depends(get_current_agent), db: Session = Depends(get_db)):
-    total_properties = db.query(House).filter(House.agent_id == current_agent.id).count()
-    available_properties = db.query(House).filter(House.agent_id == current_agent.id, House.is_available == True).count()
-    total_revenue = sum([house.rent_price for house in db.query(House).filter(House.agent_id == current_agent.id, House.is_available == False).all()])
-    
-    # Placeholder for agent rating and experience
-    agent_rating = current_agent.rating if current_agent.rating else 4.5
-    years_experience = current_agent.years_experience if current_agent.years_experience else 5
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMAT_PATTERN = "^(ndjson|csv)$"
+ANALYTICS_DEFAULT_PERIODS = 12
+
+# Widget bodies take their own session so the overview endpoints can run them
+# concurrently, each on a worker thread
 
-    recent_inquiries_count = db.query(FurnitureRequest).filter(FurnitureRequest.user_id == current_agent.id).count() # Simplified for now
+def agent_stats_widget(db: Session, agent_id: int) -> Dict[str, Any]:
+    # One read: the agent joined to its listing rollup row, plus its inquiry count
+    recent_inquiries = (
+        select(func.count(FurnitureRequest.id))
+        .where(FurnitureRequest.user_id == Agent.id) # Simplified for now
+        .scalar_subquery()
+    )
+    row = db.execute(
+        select(
+            Agent.rating,
+            Agent.years_experience,
+            AgentListingStats.total_properties,
+            AgentListingStats.available_properties,
+            AgentListingStats.rented_revenue,
+            recent_inquiries,
+        )
+        .outerjoin(AgentListingStats, AgentListingStats.agent_id == Agent.id)
+        .where(Agent.id == agent_id)
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Agent not found")
+    rating, years_experience, total_properties, available_properties, rented_revenue, recent_inquiries_count = row
 
+    # Placeholder for agent rating and experience
+    agent_rating = rating if rating else 4.5
+    years_experience = years_experience if years_experience else 5
+
+    # An agent without listings has no rollup row yet
     return {
-        "total_properties": total_properties,
-        "available_properties": available_properties,
-        "total_revenue": total_revenue,
+        "total_properties": total_properties or 0,
+        "available_properties": available_properties or 0,
+        "total_revenue": rented_revenue or 0,
         "agent_rating": agent_rating,
         "years_experience": years_experience,
         "recent_inquiries_count": recent_inquiries_count
     }
 
-@router.get("/agent/properties")
-async def get_agent_properties(current_agent: Agent = Depends(get_current_agent), db: Session = Depends(get_db)):
-    properties = db.query(House).filter(House.agent_id == current_agent.id).all()
+def agent_properties_widget(db: Session, agent_id: int) -> Dict[str, Any]:
+    properties = db.query(House).filter(House.agent_id == agent_id).all()
     return {"properties": [
         {
             "id": prop.id,
@@ -48,9 +85,13 @@ async def get_agent_properties(current_agent: Agent = Depends(get_current_agent)
         } for prop in properties
     ]}
 
-@router.get("/agent/inquiries")
-async def get_agent_inquiries(current_agent: Agent = Depends(get_current_agent), db: Session = Depends(get_db)):
-    inquiries = db.query(FurnitureRequest).filter(FurnitureRequest.user_id == current_agent.id).all()
+def agent_inquiries_widget(db: Session, agent_id: int) -> Dict[str, Any]:
+    inquiries = (
+        db.query(FurnitureRequest)
+        .options(joinedload(FurnitureRequest.user))
+        .filter(FurnitureRequest.user_id == agent_id)
+        .all()
+    )
     return {"inquiries": [
         {
             "id": req.id,
@@ -64,56 +105,12 @@ async def get_agent_inquiries(current_agent: Agent = Depends(get_current_agent),
         } for req in inquiries
     ]}
 
-@router.get("/agent/recent-activity")
-async def get_agent_recent_activity(current_agent: Agent = Depends(get_current_agent), db: Session = Depends(get_db)):
-    # This is a simplified example. In a real app, you'd track specific activities.
-    activities = [
-        {
-            "type": "property_update",
-            "title": "Updated property details for 123 Main St",
-            "description": "Changed rent price to $2500",
-            "timestamp": "2024-07-10T10:00:00Z"
-        },
-        {
-            "type": "new_inquiry",
-            "title": "New moving request for 456 Oak Ave",
-            "description": "From John Doe",
-            "timestamp": "2024-07-09T15:30:00Z"
-        }
-    ]
-    return {"activities": activities}
-
-@router.get("/admin/stats")
-async def get_admin_stats(current_admin: User = Depends(get_current_admin), db: Session = Depends(get_db)):
-    total_users = db.query(User).count()
-    recent_users = db.query(User).filter(User.created_at >= "2024-06-01").count() # Placeholder for recent
-    total_agents = db.query(Agent).count()
-    recent_agents = db.query(Agent).filter(Agent.created_at >= "2024-06-01").count() # Placeholder for recent
-    total_properties = db.query(House).count()
-    available_properties = db.query(House).filter(House.is_available == True).count()
-    rented_properties = db.query(House).filter(House.is_available == False).count()
-    total_revenue = sum([house.rent_price for house in db.query(House).filter(House.is_available == False).all()])
-    # Calculate average rating properly
-    agents_with_ratings = db.query(Agent).filter(Agent.rating != None).all()
-    average_rating = sum([agent.rating for agent in agents_with_ratings]) / len(agents_with_ratings) if agents_with_ratings else 0
-    total_inquiries = db.query(FurnitureRequest).count()
+def agent_recent_activity_widget(db: Session, agent_id: int, limit: int = 20, cursor: str = None) -> Dict[str, Any]:
+    events, next_cursor = recent_activity(db, agent_id, limit, cursor=cursor)
+    return {"activities": [activity_item(event) for event in events], "next_cursor": next_cursor}
 
-    return {
-        "total_users": total_users,
-        "recent_users": recent_users,
-        "total_agents": total_agents,
-        "recent_agents": recent_agents,
-        "total_properties": total_properties,
-        "available_properties": available_properties,
-        "rented_properties": rented_properties,
-        "total_revenue": total_revenue,
-        "average_rating": average_rating,
-        "total_inquiries": total_inquiries
-    }
-
-@router.get("/admin/properties")
-async def get_admin_properties(current_admin: User = Depends(get_current_admin), db: Session = Depends(get_db)):
-    properties = db.query(House).all()
+def admin_properties_widget(db: Session) -> Dict[str, Any]:
+    properties = db.query(House).options(joinedload(House.agent)).all()
     return {"properties": [
         {
             "id": prop.id,
@@ -128,8 +125,7 @@ async def get_admin_properties(current_admin: User = Depends(get_current_admin),
         } for prop in properties
     ]}
 
-@router.get("/admin/users")
-async def get_admin_users(current_admin: User = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_users_widget(db: Session) -> Dict[str, Any]:
     users = db.query(User).all()
     return {"users": [
         {
@@ -141,8 +137,7 @@ async def get_admin_users(current_admin: User = Depends(get_current_admin), db:
         } for user in users
     ]}
 
-@router.get("/admin/agents")
-async def get_admin_agents(current_admin: User = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_agents_widget(db: Session) -> Dict[str, Any]:
     agents = db.query(Agent).all()
     return {"agents": [
         {
@@ -158,19 +153,209 @@ async def get_admin_agents(current_admin: User = Depends(get_current_admin), db:
         } for agent in agents
     ]}
 
-@router.get("/admin/analytics")
-async def get_admin_analytics(current_admin: User = Depends(get_current_admin), db: Session = Depends(get_db)):
-    # Placeholder for more complex analytics
-    monthly_revenue = [
-        {"month": "Jan", "revenue": 15000},
-        {"month": "Feb", "revenue": 18000},
-        {"month": "Mar", "revenue": 22000},
-    ]
+def admin_analytics_widget(db: Session, granularity: str, start: date, end: date) -> Dict[str, Any]:
+    periods = periods_between(start, end, granularity)
+    buckets = listing_analytics(db, granularity, start, end)
+
+    monthly_revenue = []
+    for period in periods:
+        listed, rented, revenue = buckets.get((period, ALL_TYPES), (0, 0, 0.0))
+        monthly_revenue.append({
+            "period": period.isoformat(),
+            "revenue": revenue,
+            "rented": rented,
+            "listings": listed
+        })
+
+    type_series = {}
+    for (period, property_type), (listed, _, _) in buckets.items():
+        if property_type != ALL_TYPES and listed:
+            type_series.setdefault(property_type, {})[period] = listed
     property_types = [
-        {"type": "apartment", "count": 50},
-        {"type": "house", "count": 30},
-        {"type": "condo", "count": 20},
+        {
+            "type": property_type,
+            "count": sum(series.values()),
+            "series": [{"period": period.isoformat(), "count": series.get(period, 0)} for period in periods]
+        } for property_type, series in sorted(type_series.items(), key=lambda item: -sum(item[1].values()))
     ]
-    return {"monthly_revenue": monthly_revenue, "property_types": property_types}
 
+    # Key names kept from the original placeholder response
+    return {
+        "granularity": granularity,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "monthly_revenue": monthly_revenue,
+        "property_types": property_types
+    }
+
+def analytics_range(granularity: str, start: Optional[date], end: Optional[date]) -> Tuple[date, date]:
+    end = end or datetime.now(timezone.utc).date()
+    if start is None:
+        start = end
+        for _ in range(ANALYTICS_DEFAULT_PERIODS - 1):
+            start = period_start_of(start, granularity) - timedelta(days=1)
+    # Whole periods only, so the first bucket lines up with the stored rollups
+    start = period_start_of(start, granularity)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+    if len(periods_between(start, end, granularity)) > settings.ANALYTICS_MAX_PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range spans more than {settings.ANALYTICS_MAX_PERIODS} {granularity} periods"
+        )
+    return start, end
+
+def _run_widget(widget: Callable, *args):
+    db = SessionLocal()
+    try:
+        return widget(db, *args)
+    finally:
+        db.close()
+
+async def run_widgets(widgets: Dict[str, tuple]) -> Dict[str, Any]:
+    """Run (widget, *args) entries concurrently; failures and timeouts become null + errors."""
+    timeout = settings.DASHBOARD_WIDGET_TIMEOUT_SECONDS
+
+    async def run(widget, *args):
+        # A timed-out widget keeps its worker thread until its query returns
+        return await asyncio.wait_for(run_in_threadpool(_run_widget, widget, *args), timeout)
+
+    names = list(widgets)
+    results = await asyncio.gather(*(run(*widgets[name]) for name in names), return_exceptions=True)
+    payload, errors = {}, {}
+    for name, result in zip(names, results):
+        if isinstance(result, asyncio.TimeoutError):
+            payload[name] = None
+            errors[name] = f"Timed out after {timeout} seconds"
+        elif isinstance(result, Exception):
+            logger.error("Dashboard widget %s failed", name, exc_info=result)
+            payload[name] = None
+            errors[name] = "Failed to load"
+        else:
+            payload[name] = result
+    payload["errors"] = errors
+    return payload
+
+@router.get("/agent/overview")
+async def get_agent_overview(current_agent: Principal = Depends(get_agent_principal)):
+    # One authentication, every agent widget in one payload
+    return await run_widgets({
+        "stats": (agent_stats_widget, current_agent.id),
+        "properties": (agent_properties_widget, current_agent.id),
+        "inquiries": (agent_inquiries_widget, current_agent.id),
+        "recent_activity": (agent_recent_activity_widget, current_agent.id),
+    })
+
+@router.get("/agent/stats")
+async def get_agent_stats(current_agent: Principal = Depends(get_agent_principal), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(agent_stats_widget, current_agent.id)
+
+@router.get("/agent/properties")
+async def get_agent_properties(current_agent: Principal = Depends(get_agent_principal), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(agent_properties_widget, current_agent.id)
+
+@router.get("/agent/inquiries")
+async def get_agent_inquiries(current_agent: Principal = Depends(get_agent_principal), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(agent_inquiries_widget, current_agent.id)
+
+@router.get("/agent/recent-activity")
+async def get_agent_recent_activity(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = Query(None),
+    current_agent: Principal = Depends(get_agent_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Newest first; pass next_cursor back to read further into the log
+    try:
+        return await db.run_sync(agent_recent_activity_widget, current_agent.id, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+@router.get("/admin/overview")
+async def get_admin_overview(current_admin: Principal = Depends(get_current_admin)):
+    start, end = analytics_range("month", None, None)
+    return await run_widgets({
+        "stats": (admin_stats.get,),
+        "analytics": (admin_analytics_widget, "month", start, end),
+        "properties": (admin_properties_widget,),
+        "users": (admin_users_widget,),
+        "agents": (admin_agents_widget,),
+    })
+
+@router.get("/admin/stats")
+async def get_admin_stats(current_admin: Principal = Depends(get_current_admin)):
+    # Served from a snapshot; recomputed on a worker thread once it is stale, since
+    # other readers wait on the snapshot's lock meanwhile
+    return await run_in_threadpool(_run_widget, admin_stats.get)
+
+@router.get("/admin/properties")
+async def get_admin_properties(current_admin: Principal = Depends(get_current_admin), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(admin_properties_widget)
+
+@router.get("/admin/users")
+async def get_admin_users(current_admin: Principal = Depends(get_current_admin), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(admin_users_widget)
+
+@router.get("/admin/agents")
+async def get_admin_agents(current_admin: Principal = Depends(get_current_admin), db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(admin_agents_widget)
+
+@router.get("/admin/properties/export")
+async def export_admin_properties(
+    export_format: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    current_admin: Principal = Depends(get_current_admin),
+):
+    # Same fields as /admin/properties, with the agent name joined in the same query
+    stmt = (
+        select(
+            House.id,
+            House.title,
+            House.address,
+            House.bedrooms,
+            House.bathrooms,
+            House.square_feet,
+            House.rent_price,
+            House.is_available,
+            func.coalesce(Agent.full_name, "N/A").label("agent_name"),
+        )
+        .outerjoin(Agent, House.agent_id == Agent.id)
+        .order_by(House.id)
+    )
+    return export_response(stmt, export_format, "properties")
+
+@router.get("/admin/users/export")
+async def export_admin_users(
+    export_format: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    current_admin: Principal = Depends(get_current_admin),
+):
+    stmt = select(User.id, User.full_name, User.email, User.is_active, User.created_at).order_by(User.id)
+    return export_response(stmt, export_format, "users")
+
+@router.get("/admin/agents/export")
+async def export_admin_agents(
+    export_format: str = Query("ndjson", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    current_admin: Principal = Depends(get_current_admin),
+):
+    stmt = select(
+        Agent.id,
+        Agent.full_name,
+        Agent.email,
+        Agent.phone,
+        Agent.license_number,
+        Agent.years_experience,
+        Agent.rating,
+        Agent.is_active,
+        Agent.created_at,
+    ).order_by(Agent.id)
+    return export_response(stmt, export_format, "agents")
+
+@router.get("/admin/analytics")
+async def get_admin_analytics(
+    granularity: str = Query("month", pattern="^(day|week|month)$"),
+    start: date = Query(None, description="First day of the range (default: 12 periods back)"),
+    end: date = Query(None, description="Last day of the range, inclusive (default: today)"),
+    current_admin: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
+    start, end = analytics_range(granularity, start, end)
+    return await db.run_sync(admin_analytics_widget, granularity, start, end)
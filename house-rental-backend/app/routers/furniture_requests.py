@@ -1,11 +1,14 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import get_async_db
 from app.models.furniture_request import FurnitureRequest
 from app.models.user import User
 from app.schemas.furniture_request import FurnitureRequestCreate, FurnitureRequestUpdate, FurnitureRequestResponse
 from app.core.security import get_current_active_user
+from app.core.write_behind import activity_log
+from app.crud.activity import actor_of
 
 router = APIRouter(prefix="/furniture-requests", tags=["furniture-requests"])
 
@@ -14,7 +17,7 @@ router = APIRouter(prefix="/furniture-requests", tags=["furniture-requests"])
 async def create_furniture_request(
     request: FurnitureRequestCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not isinstance(current_user, User):
         raise HTTPException(
@@ -31,15 +34,21 @@ async def create_furniture_request(
     
     db_request = FurnitureRequest(**request.dict())
     db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    await db.commit()
+    await db.refresh(db_request)
+    # Moving requests aren't tied to an agent, so they don't appear in any agent's feed
+    activity_log.record(
+        "furniture_request_created", **actor_of(current_user),
+        target_type="furniture_request", target_id=db_request.id,
+        payload={"title": f"{db_request.pickup_city} to {db_request.delivery_city}"},
+    )
     return db_request
 
 
 @router.get("/my-requests", response_model=List[FurnitureRequestResponse])
 async def read_my_furniture_requests(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not isinstance(current_user, User):
         raise HTTPException(
@@ -47,17 +56,17 @@ async def read_my_furniture_requests(
             detail="Only users can access furniture moving requests"
         )
     
-    requests = db.query(FurnitureRequest).filter(
+    requests = await db.scalars(select(FurnitureRequest).where(
         FurnitureRequest.user_id == current_user.id
-    ).all()
-    return requests
+    ))
+    return requests.all()
 
 
 @router.get("/{request_id}", response_model=FurnitureRequestResponse)
 async def read_furniture_request(
     request_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not isinstance(current_user, User):
         raise HTTPException(
@@ -65,7 +74,7 @@ async def read_furniture_request(
             detail="Only users can access furniture moving requests"
         )
     
-    db_request = db.query(FurnitureRequest).filter(FurnitureRequest.id == request_id).first()
+    db_request = await db.get(FurnitureRequest, request_id)
     if db_request is None:
         raise HTTPException(status_code=404, detail="Furniture request not found")
     
@@ -84,7 +93,7 @@ async def update_furniture_request(
     request_id: int,
     request_update: FurnitureRequestUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not isinstance(current_user, User):
         raise HTTPException(
@@ -92,7 +101,7 @@ async def update_furniture_request(
             detail="Only users can update furniture moving requests"
         )
     
-    db_request = db.query(FurnitureRequest).filter(FurnitureRequest.id == request_id).first()
+    db_request = await db.get(FurnitureRequest, request_id)
     if db_request is None:
         raise HTTPException(status_code=404, detail="Furniture request not found")
     
@@ -108,8 +117,13 @@ async def update_furniture_request(
     for field, value in update_data.items():
         setattr(db_request, field, value)
     
-    db.commit()
-    db.refresh(db_request)
+    await db.commit()
+    await db.refresh(db_request)
+    activity_log.record(
+        "furniture_request_updated", **actor_of(current_user),
+        target_type="furniture_request", target_id=request_id,
+        payload={"fields": sorted(update_data)},
+    )
     return db_request
 
 
@@ -117,7 +131,7 @@ async def update_furniture_request(
 async def delete_furniture_request(
     request_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     if not isinstance(current_user, User):
         raise HTTPException(
@@ -125,7 +139,7 @@ async def delete_furniture_request(
             detail="Only users can delete furniture moving requests"
         )
     
-    db_request = db.query(FurnitureRequest).filter(FurnitureRequest.id == request_id).first()
+    db_request = await db.get(FurnitureRequest, request_id)
     if db_request is None:
         raise HTTPException(status_code=404, detail="Furniture request not found")
     
@@ -136,8 +150,12 @@ async def delete_furniture_request(
             detail="You can only delete your own requests"
         )
     
-    db.delete(db_request)
-    db.commit()
+    await db.delete(db_request)
+    await db.commit()
+    activity_log.record(
+        "furniture_request_deleted", **actor_of(current_user),
+        target_type="furniture_request", target_id=request_id,
+    )
     return {"message": "Furniture request deleted successfully"}
 
 
@@ -147,13 +165,13 @@ async def read_all_furniture_requests(
     skip: int = 0, 
     limit: int = 100, 
     status: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    query = db.query(FurnitureRequest)
+    query = select(FurnitureRequest)
     
     if status:
-        query = query.filter(FurnitureRequest.status == status)
+        query = query.where(FurnitureRequest.status == status)
     
-    requests = query.offset(skip).limit(limit).all()
-    return requests
+    requests = await db.scalars(query.offset(skip).limit(limit))
+    return requests.all()
 
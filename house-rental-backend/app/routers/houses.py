@@ -1,21 +1,70 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from pydantic import TypeAdapter
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from app.database.database import get_db
+from sqlalchemy import and_, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import get_async_db
+from app.database.replicas import get_read_db
 from app.models.house import House
 from app.models.agent import Agent
-from app.schemas.house import HouseCreate, HouseUpdate, HouseResponse, HouseSearch
-from app.core.security import get_current_active_user
+from app.schemas.token import Principal
+from app.schemas.house import (
+    HouseCreate, HouseUpdate, HouseResponse, HouseSearch, HouseFacetsResponse, HouseImportResult
+)
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.security import get_current_active_user, get_current_principal
+from app.core.http_cache import conditional_response, last_modified_of, list_validators, make_etag
+from app.core.pagination import InvalidCursor, keyset_page
+from app.core.search_engine import house_index
+from app.core.write_behind import activity_log, view_counts
+from app.crud import house as house_crud
+from app.crud import house_import
+from app.crud.activity import actor_of
+from app.crud.agent_listing_stats import listing_snapshot, record_house_change
 
 router = APIRouter(prefix="/houses", tags=["houses"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+facets_cache = LRUCache(maxsize=settings.FACETS_CACHE_MAX_ENTRIES, ttl=settings.FACETS_CACHE_TTL_SECONDS)
+
+# Serialized search pages: (JSON body, next cursor), bounded by entries and body bytes
+search_cache = LRUCache(
+    maxsize=settings.SEARCH_CACHE_MAX_ENTRIES,
+    ttl=settings.SEARCH_CACHE_TTL_SECONDS,
+    max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+    sizeof=lambda page: len(page[0]),
+)
+
+house_list_adapter = TypeAdapter(List[HouseResponse])
+
+
+def _set_next_cursor(response: Response, next_cursor):
+    # The body stays a plain list for existing clients; the cursor travels in a header
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def invalidate_search_caches():
+    # Any listing write can change any cached page or count
+    search_cache.clear()
+    facets_cache.clear()
+
+
+def _house_page(db: Session, criterion, limit: int, cursor, skip: int):
+    # keyset_page works on a sync Query; callers run this through AsyncSession.run_sync
+    query = db.query(House).filter(criterion)
+    return keyset_page(query, House.id, limit, cursor=cursor, offset=skip)
+
 
 @router.post("/", response_model=HouseResponse, status_code=status.HTTP_201_CREATED)
 async def create_house(
     house: HouseCreate, 
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Allow both agents and users to create properties
     # If user is not an agent, they can still create properties but need to specify an agent_id
@@ -27,7 +76,7 @@ async def create_house(
         agent_id = current_user.id if hasattr(current_user, 'id') else house.agent_id
     
     # Verify the agent exists
-    agent = db.query(Agent).filter(Agent.id == agent_id).first()
+    agent = await db.get(Agent, agent_id)
     if not agent:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -40,13 +89,113 @@ async def create_house(
     
     db_house = House(**house_data)
     db.add(db_house)
-    db.commit()
-    db.refresh(db_house)
+    await db.flush()
+    await db.run_sync(house_crud.index_house, db_house)
+    await db.run_sync(record_house_change, None, listing_snapshot(db_house))
+    await db.commit()
+    await db.refresh(db_house)
+    house_index.upsert(db_house)
+    invalidate_search_caches()
+    activity_log.record(
+        "house_created", agent_id=db_house.agent_id, **actor_of(current_user),
+        target_type="house", target_id=db_house.id,
+        payload={"title": db_house.title, "address": db_house.address},
+    )
     return db_house
 
 
-@router.get("/search", response_model=List[HouseResponse])
-async def search_houses(
+@router.post("/import", response_model=HouseImportResult)
+async def import_houses(
+    request: Request,
+    file_format: str = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Bulk-create listings for the current agent from a CSV or NDJSON request body.
+
+    Rows are validated as they stream in and inserted in batches of
+    IMPORT_BATCH_SIZE, one transaction per batch. A row that fails
+    validation only fails itself, but a database error fails its whole
+    batch. Committed batches are kept if a later batch fails or the body
+    becomes unreadable (`stopped` in the report). In CSV, list fields
+    (amenities, features, images) are separated by "|".
+    """
+    if current_user.user_type != "agent":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only agents can import house listings"
+        )
+
+    if file_format is None:
+        content_type = request.headers.get("content-type", "")
+        file_format = "csv" if "csv" in content_type else "ndjson" if "json" in content_type else None
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson"
+        )
+
+    max_line_bytes = settings.IMPORT_MAX_LINE_BYTES
+    lines = house_import.iter_lines(request.stream(), max_line_bytes)
+    if file_format == "csv":
+        records = house_import.iter_csv_records(lines, max_line_bytes)
+    else:
+        records = house_import.iter_ndjson_records(lines)
+
+    report = house_import.ImportReport(settings.IMPORT_MAX_ERRORS)
+    batch, batch_rows = [], []
+
+    async def flush_batch():
+        """Insert and commit the pending rows; on a database error none of them are kept."""
+        try:
+            houses = await db.run_sync(house_import.insert_house_batch, batch)
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            message = f"Batch insert failed: {e.__class__.__name__}"
+            for row in batch_rows:
+                report.fail(row, [message])
+        else:
+            report.imported += len(houses)
+            for db_house in houses:
+                house_index.upsert(db_house)
+        batch.clear()
+        batch_rows.clear()
+
+    row = 0
+    try:
+        async for row, fields, error in records:
+            if error is not None:
+                report.fail(row, [error])
+                continue
+            values, errors = house_import.validate_house_row(fields, current_user.id)
+            if errors:
+                report.fail(row, errors)
+                continue
+            batch.append(values)
+            batch_rows.append(row)
+            if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                await flush_batch()
+    except house_import.ImportStopped as e:
+        # The stream cannot be resynchronised reliably; keep what was read so far
+        report.stop(row + 1, str(e))
+    except UnicodeDecodeError:
+        report.stop(row + 1, "Body is not valid UTF-8")
+    if batch:
+        await flush_batch()
+
+    if report.imported:
+        invalidate_search_caches()
+    activity_log.record(
+        "houses_imported", agent_id=current_user.id, **actor_of(current_user),
+        payload={"description": f"{report.imported} imported, {report.failed} failed",
+                 "imported": report.imported, "failed": report.failed},
+    )
+    return report.as_dict()
+
+
+def search_filters(
+    q: str = Query(None, max_length=200),
     city: str = Query(None),
     state: str = Query(None),
     min_price: float = Query(None),
@@ -58,81 +207,159 @@ async def search_houses(
     property_type: str = Query(None),
     pet_policy: str = Query(None),
     parking: str = Query(None),
+    amenities: List[str] = Query(None, description="Required amenities; repeat the parameter or comma-separate"),
     available_only: bool = Query(True),
-    limit: int = Query(20, le=100),
+    lat: float = Query(None, ge=-90, le=90),
+    lon: float = Query(None, ge=-180, le=180),
+    radius_km: float = Query(None, gt=0, le=500),
+    min_lat: float = Query(None, ge=-90, le=90),
+    max_lat: float = Query(None, ge=-90, le=90),
+    min_lon: float = Query(None, ge=-180, le=180),
+    max_lon: float = Query(None, ge=-180, le=180),
+) -> HouseSearch:
+    """Filter query parameters shared by /houses/search and /houses/facets."""
+    if radius_km is not None and (lat is None or lon is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="lat and lon are required for radius search and distance sorting"
+        )
+
+    return HouseSearch(
+        q=q,
+        city=city,
+        state=state,
+        min_price=min_price,
+        max_price=max_price,
+        min_bedrooms=min_bedrooms,
+        max_bedrooms=max_bedrooms,
+        min_bathrooms=min_bathrooms,
+        max_bathrooms=max_bathrooms,
+        property_type=property_type,
+        pet_policy=pet_policy,
+        parking=parking,
+        amenities=[name for value in amenities for name in value.split(",")] if amenities else None,
+        available_only=available_only,
+        lat=lat,
+        lon=lon,
+        radius_km=radius_km,
+        min_lat=min_lat,
+        max_lat=max_lat,
+        min_lon=min_lon,
+        max_lon=max_lon,
+    )
+
+
+@router.get("/search", response_model=List[HouseResponse])
+async def search_houses(
+    search: HouseSearch = Depends(search_filters),
+    sort_by: str = Query(None, pattern="^(relevance|price|distance)$"),
+    limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(House)
-    
-    # Apply filters
-    if available_only:
-        query = query.filter(House.is_available == True)
-    
-    if city:
-        query = query.filter(House.city.ilike(f"%{city}%"))
-    
-    if state:
-        query = query.filter(House.state.ilike(f"%{state}%"))
-    
-    if min_price is not None:
-        query = query.filter(House.rent_price >= min_price)
-    
-    if max_price is not None:
-        query = query.filter(House.rent_price <= max_price)
-    
-    if min_bedrooms is not None:
-        query = query.filter(House.bedrooms >= min_bedrooms)
-    
-    if max_bedrooms is not None:
-        query = query.filter(House.bedrooms <= max_bedrooms)
-    
-    if min_bathrooms is not None:
-        query = query.filter(House.bathrooms >= min_bathrooms)
-    
-    if max_bathrooms is not None:
-        query = query.filter(House.bathrooms <= max_bathrooms)
-    
-    if property_type:
-        query = query.filter(House.property_type == property_type)
-    
-    if pet_policy:
-        query = query.filter(House.pet_policy == pet_policy)
-    
-    if parking:
-        query = query.filter(House.parking == parking)
-    
-    houses = query.offset(offset).limit(limit).all()
+    if sort_by == "distance" and (search.lat is None or search.lon is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="lat and lon are required for radius search and distance sorting"
+        )
+
+    search = search.model_copy(update={"sort_by": sort_by, "limit": limit, "offset": offset})
+    cache_key = (house_crud.search_cache_key(search, exclude=()), cursor)
+    page = search_cache.get(cache_key)
+    if page is None:
+        generation = search_cache.generation
+        try:
+            houses, next_cursor = await db.run_sync(house_crud.search_houses, search, cursor=cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        body = house_list_adapter.dump_json(house_list_adapter.validate_python(houses, from_attributes=True))
+        page = (body, next_cursor)
+        search_cache.set(cache_key, page, generation=generation)
+
+    body, next_cursor = page
+    response = Response(content=body, media_type="application/json")
+    _set_next_cursor(response, next_cursor)
+    return response
+
+
+@router.get("/facets", response_model=HouseFacetsResponse)
+async def read_house_facets(
+    search: HouseSearch = Depends(search_filters),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Counts for every facet in one grouped pass, cached briefly per filter set
+    cache_key = house_crud.search_cache_key(search)
+    facets = facets_cache.get(cache_key)
+    if facets is None:
+        generation = facets_cache.generation
+        facets = await db.run_sync(house_crud.facet_counts, search)
+        facets_cache.set(cache_key, facets, generation=generation)
+    return facets
+
+
+@router.get("/nearby", response_model=List[HouseResponse])
+async def read_nearby_houses(
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5, gt=0, le=500),
+    available_only: bool = Query(True),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0),
+    cursor: str = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Nearest first; each result carries its distance_km from (lat, lon)
+    search = HouseSearch(
+        lat=lat,
+        lon=lon,
+        radius_km=radius_km,
+        available_only=available_only,
+        sort_by="distance",
+        limit=limit,
+        offset=offset,
+    )
+    try:
+        houses, next_cursor = await db.run_sync(house_crud.search_houses, search, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    _set_next_cursor(response, next_cursor)
     return houses
 
 
 @router.get("/{house_id}", response_model=HouseResponse)
-async def read_house(house_id: int, db: Session = Depends(get_db)):
-    db_house = db.query(House).filter(House.id == house_id).first()
+async def read_house(house_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
+    db_house = await db.get(House, house_id)
     if db_house is None:
         raise HTTPException(status_code=404, detail="House not found")
     
-    # Increment view count
-    db_house.views_count += 1
-    db.commit()
-    
-    return db_house
+    # Count the view in memory; the buffer writes it back in batches
+    view_counts.increment(house_id)
+
+    last_modified = last_modified_of(db_house)
+    not_modified = conditional_response(request, response, make_etag("house", house_id, last_modified), last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    house = HouseResponse.model_validate(db_house)
+    return house.model_copy(update={"views_count": house.views_count + view_counts.pending(house_id)})
 
 
 @router.put("/{house_id}", response_model=HouseResponse)
 async def update_house(
     house_id: int,
     house_update: HouseUpdate,
-    current_user: Agent = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not isinstance(current_user, Agent):
+    if current_user.user_type != "agent":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only agents can update house listings"
         )
     
-    db_house = db.query(House).filter(House.id == house_id).first()
+    db_house = await db.get(House, house_id)
     if db_house is None:
         raise HTTPException(status_code=404, detail="House not found")
     
@@ -144,28 +371,40 @@ async def update_house(
         )
     
     # Update house fields
+    before = listing_snapshot(db_house)
     update_data = house_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_house, field, value)
     
-    db.commit()
-    db.refresh(db_house)
+    await db.flush()
+    await db.run_sync(house_crud.index_house, db_house)
+    await db.run_sync(record_house_change, before, listing_snapshot(db_house))
+    await db.commit()
+    await db.refresh(db_house)
+    house_index.upsert(db_house)
+    invalidate_search_caches()
+    activity_log.record(
+        "house_updated", agent_id=db_house.agent_id, **actor_of(current_user),
+        target_type="house", target_id=house_id,
+        payload={"title": db_house.title, "description": "Changed " + ", ".join(sorted(update_data)),
+                 "fields": sorted(update_data)},
+    )
     return db_house
 
 
 @router.delete("/{house_id}")
 async def delete_house(
     house_id: int,
-    current_user: Agent = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    if not isinstance(current_user, Agent):
+    if current_user.user_type != "agent":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only agents can delete house listings"
         )
     
-    db_house = db.query(House).filter(House.id == house_id).first()
+    db_house = await db.get(House, house_id)
     if db_house is None:
         raise HTTPException(status_code=404, detail="House not found")
     
@@ -176,19 +415,64 @@ async def delete_house(
             detail="You can only delete your own listings"
         )
     
-    db.delete(db_house)
-    db.commit()
+    title = db_house.title
+    await db.run_sync(house_crud.unindex_house, db_house)
+    await db.run_sync(record_house_change, listing_snapshot(db_house), None)
+    await db.delete(db_house)
+    await db.commit()
+    house_index.remove(house_id)
+    invalidate_search_caches()
+    activity_log.record(
+        "house_deleted", agent_id=current_user.id, **actor_of(current_user),
+        target_type="house", target_id=house_id, payload={"title": title},
+    )
     return {"message": "House listing deleted successfully"}
 
 
 @router.get("/", response_model=List[HouseResponse])
-async def read_houses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    houses = db.query(House).filter(House.is_available == True).offset(skip).limit(limit).all()
+async def read_houses(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    criterion = House.is_available == True
+    count, last_modified = await list_validators(db, select(House).where(criterion), House)
+    etag = make_etag("houses", request.url.query, count, last_modified)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    try:
+        houses, next_cursor = await db.run_sync(_house_page, criterion, limit, cursor, skip)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    _set_next_cursor(response, next_cursor)
     return houses
 
 
 @router.get("/agent/{agent_id}", response_model=List[HouseResponse])
-async def read_houses_by_agent(agent_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    houses = db.query(House).filter(House.agent_id == agent_id).offset(skip).limit(limit).all()
-    return houses
+async def read_houses_by_agent(
+    agent_id: int,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1),
+    cursor: str = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    criterion = House.agent_id == agent_id
+    count, last_modified = await list_validators(db, select(House).where(criterion), House)
+    etag = make_etag("agent-houses", agent_id, request.url.query, count, last_modified)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
 
+    try:
+        houses, next_cursor = await db.run_sync(_house_page, criterion, limit, cursor, skip)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    _set_next_cursor(response, next_cursor)
+    return houses
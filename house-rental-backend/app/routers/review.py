@@ -1,17 +1,19 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from app.database.database import get_db
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import get_async_db
+from app.database.replicas import get_read_db
 from app.models.review import Review
 from app.schemas.review import ReviewCreate, ReviewRead, ReviewResponse
 from app.core.security import get_current_active_user
+from app.core.write_behind import activity_log
 
 router = APIRouter(prefix="/reviews", tags=["reviews"])
 
 # Create a new review
 @router.post("/", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
-def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
+async def create_review(review: ReviewCreate, db: AsyncSession = Depends(get_async_db)):
     db_review = Review(
         agent_id=review.agent_id,
         author=review.author,
@@ -20,44 +22,56 @@ def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
         comment=review.comment
     )
     db.add(db_review)
-    db.commit()
-    db.refresh(db_review)
+    await db.commit()
+    await db.refresh(db_review)
+    activity_log.record(
+        "review_created", agent_id=db_review.agent_id,
+        target_type="review", target_id=db_review.id,
+        payload={"title": db_review.author, "description": f"Rated {db_review.rating}", "rating": db_review.rating},
+    )
     return ReviewResponse.from_orm(db_review)
 
 # Get a review by ID
 @router.get("/{review_id}", response_model=ReviewResponse)
-def get_review(review_id: int, db: Session = Depends(get_db)):
-    db_review = db.query(Review).filter(Review.id == review_id).first()
+async def get_review(review_id: int, db: AsyncSession = Depends(get_read_db)):
+    db_review = await db.get(Review, review_id)
     if db_review is None:
         raise HTTPException(status_code=404, detail="Review not found")
     return ReviewResponse.from_orm(db_review)
 
 # Get all reviews for an agent
 @router.get("/agent/{agent_id}", response_model=List[ReviewResponse])
-def get_reviews_by_agent(agent_id: int, db: Session = Depends(get_db)):
-    db_reviews = db.query(Review).filter(Review.agent_id == agent_id).all()
+async def get_reviews_by_agent(agent_id: int, db: AsyncSession = Depends(get_read_db)):
+    db_reviews = (await db.scalars(select(Review).where(Review.agent_id == agent_id))).all()
     return [ReviewResponse.from_orm(r) for r in db_reviews]
 
 # Update a review
 @router.put("/{review_id}", response_model=ReviewResponse)
-def update_review(review_id: int, review_update: ReviewCreate, db: Session = Depends(get_db)):
-    db_review = db.query(Review).filter(Review.id == review_id).first()
+async def update_review(review_id: int, review_update: ReviewCreate, db: AsyncSession = Depends(get_async_db)):
+    db_review = await db.get(Review, review_id)
     if db_review:
         db_review.author = review_update.author
         db_review.rating = review_update.rating
         db_review.date = review_update.date
         db_review.comment = review_update.comment
-        db.commit()
-        db.refresh(db_review)
+        await db.commit()
+        await db.refresh(db_review)
+        activity_log.record(
+            "review_updated", agent_id=db_review.agent_id,
+            target_type="review", target_id=review_id,
+            payload={"title": db_review.author, "description": f"Rated {db_review.rating}", "rating": db_review.rating},
+        )
         return ReviewResponse.from_orm(db_review)
     raise HTTPException(status_code=404, detail="Review not found")
 
 # Delete a review
 @router.delete("/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_review(review_id: int, db: Session = Depends(get_db)):
-    db_review = db.query(Review).filter(Review.id == review_id).first()
+async def delete_review(review_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_review = await db.get(Review, review_id)
     if db_review:
-        db.delete(db_review)
-        db.commit()
+        agent_id = db_review.agent_id
+        await db.delete(db_review)
+        await db.commit()
+        activity_log.record("review_deleted", agent_id=agent_id, target_type="review", target_id=review_id)
         return
     raise HTTPException(status_code=404, detail="Review not found")
\ No newline at end of file
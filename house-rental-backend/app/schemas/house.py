@@ -67,6 +67,7 @@ class HouseUpdate(BaseModel):
 
 
 class HouseSearch(BaseModel):
+    q: Optional[str] = None  # free text over title, description and address
     city: Optional[str] = None
     state: Optional[str] = None
     min_price: Optional[float] = None
@@ -80,6 +81,15 @@ class HouseSearch(BaseModel):
     pet_policy: Optional[str] = None
     parking: Optional[str] = None
     available_only: bool = True
+    # Geo filters: a center point with optional radius, and/or a bounding box
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    radius_km: Optional[float] = None
+    min_lat: Optional[float] = None
+    max_lat: Optional[float] = None
+    min_lon: Optional[float] = None
+    max_lon: Optional[float] = None
+    sort_by: Optional[str] = None  # "relevance" (default with q), "price" or "distance" (requires lat/lon)
     limit: int = 20
     offset: int = 0
 
@@ -92,7 +102,41 @@ class HouseResponse(HouseBase):
     views_count: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    distance_km: Optional[float] = None  # only set for geo searches with a center point
 
     class Config:
         from_attributes = True
 
+
+class FacetCount(BaseModel):
+    value: Optional[str] = None
+    count: int
+
+
+class PriceBucketCount(BaseModel):
+    value: str
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    count: int
+
+
+class HouseFacetsResponse(BaseModel):
+    total: int
+    property_type: List[FacetCount]
+    bedrooms: List[FacetCount]
+    pet_policy: List[FacetCount]
+    parking: List[FacetCount]
+    price: List[PriceBucketCount]
+
+
+class HouseImportError(BaseModel):
+    row: int  # 1-based data row, not counting the CSV header
+    errors: List[str]
+
+
+class HouseImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[HouseImportError]
+    errors_truncated: bool = False
+    stopped: bool = False  # the body became unreadable; rows imported before that stay committed
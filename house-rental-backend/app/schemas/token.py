@@ -5,9 +5,22 @@ from typing import Optional
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
     username: Optional[str] = None
     user_type: Optional[str] = None  # "user" or "agent" "admin"
 
+
+class Principal(BaseModel):
+    """The identity behind a token, as cached by core.security."""
+    id: int
+    user_type: str  # "user" or "agent"
+    username: str
+    is_active: bool
+    is_admin: bool = False
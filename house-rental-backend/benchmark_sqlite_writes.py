@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Compare SQLite under concurrent reads and writes with and without performance mode.
+
+Runs the same workload twice on a scratch database file. Writer threads
+read a listing and bump its views_count in one transaction, the pattern
+that used to run on every house view. Reader threads page through
+listings. The default run uses a plain engine with rollback journaling;
+the performance run uses WAL, the SQLITE_* pragmas and the single writer
+connection, as with SQLITE_PERFORMANCE_MODE=true.
+
+    python benchmark_sqlite_writes.py --writers 8 --readers 8 --seconds 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from app.database.database import Base
+from app.database.sqlite import WriterRoutingSession, apply_performance_pragmas, use_immediate_transactions
+from app.models import Agent, House
+
+
+def seed(url: str, houses: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Agent(email="bench@example.com", username="bench", full_name="Bench", phone="0",
+                     license_number="BENCH", hashed_password="-"))
+        db.flush()
+        db.execute(House.__table__.insert(), [
+            dict(title=f"House {i}", description="-", address=f"{i} Main St", city="Springfield",
+                 state="IL", zip_code="62701", property_type="house", bedrooms=2, bathrooms=1,
+                 rent_price=1000 + i, agent_id=1, is_available=True, views_count=0)
+            for i in range(houses)
+        ])
+        db.commit()
+    engine.dispose()
+
+
+def default_sessions(url: str, threads: int):
+    engine = create_engine(url, poolclass=QueuePool, pool_size=threads, connect_args={"check_same_thread": False})
+    return sessionmaker(bind=engine), [engine]
+
+
+def performance_sessions(url: str, threads: int):
+    connect_args = {"check_same_thread": False}
+    reader = create_engine(url, poolclass=QueuePool, pool_size=threads, connect_args=connect_args)
+    writer = create_engine(url, poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=60,
+                           connect_args=connect_args)
+    for engine in (reader, writer):
+        apply_performance_pragmas(engine)
+    use_immediate_transactions(writer)
+    return sessionmaker(class_=WriterRoutingSession, reader=reader, writer=writer), [reader, writer]
+
+
+def run(make_session, args) -> dict:
+    deadline = time.monotonic() + args.seconds
+    lock = threading.Lock()
+    totals = {"writes": 0, "reads": 0, "locked": 0}
+    read_latencies = []
+
+    def writer(n: int):
+        house_id = 0
+        while time.monotonic() < deadline:
+            house_id = house_id % args.houses + 1
+            with make_session() as db:
+                try:
+                    views = db.scalar(select(House.views_count).where(House.id == house_id))
+                    db.execute(update(House).where(House.id == house_id).values(views_count=views + 1))
+                    db.commit()
+                except OperationalError as e:
+                    db.rollback()
+                    if "locked" not in str(e):
+                        raise
+                    with lock:
+                        totals["locked"] += 1
+                    continue
+            with lock:
+                totals["writes"] += 1
+
+    def reader(n: int):
+        offset = 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            with make_session() as db:
+                try:
+                    db.scalars(select(House).order_by(House.rent_price).offset(offset).limit(20)).all()
+                except OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    with lock:
+                        totals["locked"] += 1
+                    continue
+            offset = (offset + 20) % args.houses
+            with lock:
+                totals["reads"] += 1
+                read_latencies.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    read_latencies.sort()
+    return {
+        **totals,
+        "read_p50": statistics.median(read_latencies) if read_latencies else 0.0,
+        "read_p99": read_latencies[int(len(read_latencies) * 0.99) - 1] if len(read_latencies) > 1 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--houses", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s per mode")
+    print(f"{'mode':<12} {'writes/s':>9} {'reads/s':>9} {'locked':>7} {'read p50 ms':>12} {'read p99 ms':>12}")
+    threads = args.writers + args.readers
+    for mode, factory in (("default", default_sessions), ("performance", performance_sessions)):
+        with tempfile.TemporaryDirectory() as directory:
+            url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+            seed(url, args.houses)
+            make_session, engines = factory(url, threads)
+            result = run(make_session, args)
+            for engine in engines:
+                engine.dispose()
+        print(
+            f"{mode:<12} {result['writes'] / args.seconds:>9.0f} {result['reads'] / args.seconds:>9.0f} "
+            f"{result['locked']:>7} {result['read_p50']:>12.1f} {result['read_p99']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""Recompute the agent_listing_stats rollup from the houses table.
+
+The rollup is normally kept current by the house write paths; run this
+after bulk edits made outside the API or if the counts look off.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database.database import SessionLocal
+from app.crud.agent_listing_stats import rebuild_agent_listing_stats
+
+def main():
+    db = SessionLocal()
+    
+    try:
+        rows = rebuild_agent_listing_stats(db)
+        print(f"Rebuilt listing stats for {rows} agents")
+    except Exception as e:
+        print(f"Error rebuilding listing stats: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()